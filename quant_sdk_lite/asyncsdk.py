@@ -0,0 +1,306 @@
+import asyncio
+import aiohttp
+from typing import Union, List, Tuple, Iterable, TYPE_CHECKING
+
+from .quantsdk import BlockSize
+from .ratelimit import RateLimiter
+from . import decode
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class AsyncBlockSize:
+
+    def __init__(
+            self,
+            token: str,
+            base_url: str = "https://api.blocksize.capital/v1",
+            max_connections: int = 32,
+            timeout: float = 30,
+            connect_timeout: float = 3.05,
+            limiter: RateLimiter = None):
+
+        """
+
+        :param token: Blocksize CORE API token
+        :param base_url: API root, override to point at a local stand-in server
+        :param max_connections: upper bound on requests in flight and on pooled connections
+        :param timeout: total seconds allowed per request
+        :param connect_timeout: seconds allowed to establish a connection
+        :param limiter: client-side rate limiting and retries, may be shared with a synchronous Transport
+        """
+
+        self.token = token
+        self.base_url = base_url.rstrip('/')
+        self.max_connections = max_connections
+        self.limiter = limiter
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.headers = {
+            "x-api-key": token,
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        }
+        self._session = None
+        self._semaphore = None
+
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.max_connections)
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.headers, timeout=self.timeout)
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+        return self._session
+
+    async def _request(self, method: str, path: str, data: dict = None):
+        session = await self._ensure_session()
+        if self.limiter is None:
+            async with self._semaphore:
+                async with session.request(method, self.base_url + path, data=data) as response:
+                    return decode.loads(await response.read())
+
+        category = self.limiter.category(path)
+        attempt = 0
+        while True:
+            await self.limiter.acquire_async(category)
+            status, retry_after = None, None
+            try:
+                async with self._semaphore:
+                    async with session.request(method, self.base_url + path, data=data) as response:
+                        status = response.status
+                        retry_after = response.headers.get('Retry-After')
+                        if not self.limiter.should_retry(method, status, attempt):
+                            return decode.loads(await response.read())
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if not self.limiter.should_retry(method, None, attempt):
+                    raise
+            finally:
+                self.limiter.release(category, status)
+            await asyncio.sleep(self.limiter.retry_delay(attempt, retry_after))
+            attempt += 1
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        await self._ensure_session()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def get_orderbook_data(self, exchanges: Union[str, List[str]], base: str, quote: str, depth: int = 1):
+
+        if exchanges is None:
+            pass
+        else:
+            if type(exchanges) == list:
+                exchanges = list(map(lambda exchange: exchange.upper(), exchanges))
+                exchanges = ','.join(exchanges)
+            if type(exchanges) == str:
+                exchanges = exchanges.replace(' ', '')
+
+        if base is None or quote is None:
+            raise ValueError('Either pair or base and quote need to be specified')
+
+        pair = base + quote
+        return await self._request('GET', f"/data/orderbook?exchanges={exchanges}&ticker={pair}&limit={depth}")
+
+    async def get_vwap(self, base: str, quote: str, interval: str):
+        pair = base + quote
+        return await self._request('GET', f"/data/vwap/latest/{pair}/{BlockSize.converter(interval)}")
+
+    async def get_ohlc(self, base: str, quote: str, interval: str):
+        pair = base + quote
+        return await self._request('GET', f"/data/ohlc/latest/{pair}/{BlockSize.converter(interval)}")
+
+    async def get_historic_vwap(self, base: str, quote: str, interval: str, start_date: int, end_date: int,
+                                output: str = 'pandas'):
+        records = await self.get_historic_records('vwap', base, quote, interval, start_date, end_date)
+        return decode.convert(decode.decode_records('vwap', records), output)
+
+    async def get_historic_ohlc(self, base: str, quote: str, interval: str, start_date: int, end_date: int,
+                                output: str = 'pandas'):
+        records = await self.get_historic_records('ohlc', base, quote, interval, start_date, end_date)
+        return decode.convert(decode.decode_records('ohlc', records), output)
+
+    async def get_historic_records(
+            self,
+            endpoint: str,
+            base: str,
+            quote: str,
+            interval: str,
+            start_date: int,
+            end_date: int) -> list:
+        pair = base + quote
+        return await self._request('GET', f"/data/{endpoint}/historic/"
+                                          f"{pair}/{BlockSize.converter(interval)}?from={start_date}&to={end_date}")
+
+    async def post_simulated_order(
+            self,
+            base: str,
+            quote: str,
+            direction: str,
+            quantity: Union[str, float, int],
+            exchanges: Union[str, List[str]] = None,
+            unlimited_funds: bool = False,
+            disable_logging: bool = False) -> dict:
+
+        if exchanges is None:
+            pass
+        else:
+            if type(exchanges) == list:
+                exchanges = list(map(lambda exchange: exchange.upper(), exchanges))
+                exchanges = ','.join(exchanges)
+            elif type(exchanges) == str:
+                exchanges = exchanges.upper()
+
+        params = {
+            'BaseCurrency': base.upper(),
+            'QuoteCurrency': quote.upper(),
+            'Quantity': str(quantity),
+            'Direction': direction.upper(),
+            'Type': 'Market',
+            'ExchangeList': exchanges,
+            'Unlimited': str(unlimited_funds),
+            'DisableLogging': str(disable_logging),
+        }
+        params = {key: value for key, value in params.items() if value is not None}
+
+        return await self._request('POST', "/trading/orders/simulated", data=params)
+
+    async def post_market_order(
+            self,
+            base: str,
+            quote: str,
+            direction: str,
+            quantity: Union[str, float, int],
+            exchanges: Union[str, List[str]] = None) -> dict:
+
+        if exchanges is None:
+            pass
+        else:
+            if type(exchanges) == list:
+                exchanges = list(map(lambda exchange: exchange.upper(), exchanges))
+                exchanges = ','.join(exchanges)
+            elif type(exchanges) == str:
+                exchanges = exchanges.upper()
+
+        params = {
+            'BaseCurrency': base.upper(),
+            'QuoteCurrency': quote.upper(),
+            'Quantity': str(quantity),
+            'Direction': direction,
+            'Type': 'MARKET',
+            'ExchangeList': exchanges,
+        }
+        params = {key: value for key, value in params.items() if value is not None}
+
+        return await self._request('POST', "/trading/orders?", data=params)
+
+    async def order_status(self, order_id: str):
+        return await self._request('GET', f"/trading/orders/id/{order_id}")
+
+    async def order_logs(self, order_id: str):
+        return await self._request('GET', f'/trading/orders/id/{order_id}/logs')
+
+    async def get_exchange_balances(self):
+        return await self._request('GET', '/positions/exchanges')
+
+    async def get_vwap_many(self, pairs: Iterable[Tuple[str, str]], interval: str) -> 'pd.DataFrame':
+
+        """
+
+        :param pairs: [('BTC', 'EUR'), ('ETH', 'EUR'), ...]
+        :param interval: 1s, 5s, 30s, 1m, 5m, 30m, 60m
+        :return: DataFrame indexed by pair with one column per response field
+        """
+
+        pairs = list(pairs)
+        results = await asyncio.gather(*(self.get_vwap(base, quote, interval) for base, quote in pairs))
+        return self._combine(pairs, results)
+
+    async def get_ohlc_many(self, pairs: Iterable[Tuple[str, str]], interval: str) -> 'pd.DataFrame':
+
+        """
+
+        :param pairs: [('BTC', 'EUR'), ('ETH', 'EUR'), ...]
+        :param interval: 1s, 5s, 30s, 1m, 5m, 30m, 60m
+        :return: DataFrame indexed by pair with one column per response field
+        """
+
+        pairs = list(pairs)
+        results = await asyncio.gather(*(self.get_ohlc(base, quote, interval) for base, quote in pairs))
+        return self._combine(pairs, results)
+
+    async def get_orderbook_many(
+            self,
+            pairs: Iterable[Tuple[str, str]],
+            exchanges: Union[str, List[str]],
+            depth: int = 1) -> dict:
+
+        """
+
+        Requests every (pair, exchange) combination concurrently.
+
+        :param pairs: [('BTC', 'EUR'), ('ETH', 'EUR'), ...]
+        :param exchanges: Binance, Kraken, ...
+        :param depth: number of levels per side
+        :return: {pair: [{'exchange': ..., 'asks': ..., 'bids': ...}, ...]}, an exchange whose request failed is listed
+        as {'exchange': ..., 'error': <response body>}
+        """
+
+        if type(exchanges) == str:
+            exchanges = exchanges.replace(' ', '').split(',')
+        jobs = [(base + quote, base, quote, exchange) for base, quote in pairs for exchange in exchanges]
+        results = await asyncio.gather(*(self.get_orderbook_data(exchange, base, quote, depth)
+                                         for _, base, quote, exchange in jobs))
+
+        books = {}
+        for (pair, _, _, exchange), result in zip(jobs, results):
+            books.setdefault(pair, [])
+            if isinstance(result, list):
+                books[pair].extend(result)
+            elif result is not None:
+                books[pair].append({'exchange': exchange.upper(), 'error': result})
+        return books
+
+    async def get_top_of_book_many(
+            self,
+            pairs: Iterable[Tuple[str, str]],
+            exchanges: Union[str, List[str]]) -> 'pd.DataFrame':
+
+        """
+
+        :param pairs: [('BTC', 'EUR'), ('ETH', 'EUR'), ...]
+        :param exchanges: Binance, Kraken, ...
+        :return: DataFrame indexed by (pair, exchange) with best bid/ask price and size, NaN where the request failed
+        """
+
+        books = await self.get_orderbook_many(pairs, exchanges, depth=1)
+        rows = []
+        for pair, entries in books.items():
+            for entry in entries:
+                bids, asks = entry.get('bids') or [], entry.get('asks') or []
+                rows.append({
+                    'pair': pair,
+                    'exchange': entry.get('exchange'),
+                    'bid': float(bids[0][0]) if bids else float('nan'),
+                    'bid_size': float(bids[0][1]) if bids else float('nan'),
+                    'ask': float(asks[0][0]) if asks else float('nan'),
+                    'ask_size': float(asks[0][1]) if asks else float('nan'),
+                })
+        import pandas as pd
+
+        df = pd.DataFrame(rows, columns=['pair', 'exchange', 'bid', 'bid_size', 'ask', 'ask_size'])
+        df.set_index(['pair', 'exchange'], inplace=True)
+        return df
+
+    @staticmethod
+    def _combine(pairs: List[Tuple[str, str]], results: list) -> 'pd.DataFrame':
+        import pandas as pd
+
+        df = pd.DataFrame([result if isinstance(result, dict) else {} for result in results],
+                          index=pd.Index([base + quote for base, quote in pairs], name='pair'))
+        return df
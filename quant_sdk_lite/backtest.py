@@ -0,0 +1,186 @@
+import itertools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Union, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
+
+
+class BacktestResult:
+
+    def __init__(self, frame: 'pd.DataFrame', trades: 'pd.DataFrame', metrics: dict, params: dict):
+
+        """
+
+        :param frame: per bar price, position, gross and net return, fees and equity
+        :param trades: one row per bar on which the position changed
+        :param metrics: summary statistics, see run_backtest
+        :param params: parameters the signal was called with
+        """
+
+        self.frame = frame
+        self.trades = trades
+        self.metrics = metrics
+        self.params = params
+
+    def __repr__(self) -> str:
+        return f'BacktestResult(params={self.params}, metrics={self.metrics})'
+
+
+def _price_column(df: 'pd.DataFrame', price_column: str = None) -> str:
+    if price_column is not None:
+        return price_column
+    for column in ('Close', 'Price', 'close', 'price'):
+        if column in df.columns:
+            return column
+    raise ValueError('No price column found, pass price_column')
+
+
+def _periods_per_year(index: 'pd.Index') -> float:
+    import pandas as pd
+
+    if len(index) < 2:
+        return np.nan
+    if isinstance(index, pd.DatetimeIndex):
+        step = np.median(np.diff(index.values)) / np.timedelta64(1, 's')
+    else:
+        step = np.median(np.diff(np.asarray(index, dtype=np.float64)))
+    return SECONDS_PER_YEAR / step if step > 0 else np.nan
+
+
+def run_backtest(
+        df: 'pd.DataFrame',
+        signal: Callable[..., Union['pd.Series', np.ndarray]],
+        fee_bp: float = 10,
+        price_column: str = None,
+        periods_per_year: float = None,
+        **params) -> BacktestResult:
+
+    """
+
+    The signal is called as signal(df, **params) and returns the target position per bar, e.g. 1 long, -1 short,
+    0 flat. The position decided on a bar's price is held over the following bar, so a signal that only looks at data
+    up to its own bar cannot see the future. Every change of position pays fee_bp basis points of the traded amount.
+
+    :param df: result of get_historic_ohlc or get_historic_vwap
+    :param signal: function returning one target position per row of df
+    :param fee_bp: fee in basis points of the traded notional
+    :param price_column: defaults to Close, then Price
+    :param periods_per_year: used for annualization, inferred from the index spacing when omitted
+    :return: BacktestResult with metrics total_return, annual_return, annual_volatility, sharpe, max_drawdown,
+    trades, turnover, exposure and hit_rate
+    """
+
+    import pandas as pd
+
+    price = df[_price_column(df, price_column)].to_numpy(dtype=np.float64)
+    position = np.nan_to_num(np.asarray(signal(df, **params), dtype=np.float64))
+    if position.shape != price.shape:
+        raise ValueError(f'Signal returned {position.shape[0]} positions for {price.shape[0]} bars')
+
+    returns = np.zeros_like(price)
+    returns[1:] = price[1:] / price[:-1] - 1
+    held = np.zeros_like(position)
+    held[1:] = position[:-1]
+    gross = held * returns
+    turnover = np.abs(np.diff(position, prepend=0.0))
+    fees = turnover * fee_bp / 1e4
+    net = gross - fees
+    equity = np.cumprod(1 + net)
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+
+    frame = pd.DataFrame({
+        'price': price,
+        'position': position,
+        'return': gross,
+        'fees': fees,
+        'net_return': net,
+        'equity': equity,
+        'drawdown': drawdown,
+    }, index=df.index)
+
+    changed = turnover > 0
+    trades = pd.DataFrame({
+        'price': price[changed],
+        'size': np.diff(position, prepend=0.0)[changed],
+        'position': position[changed],
+        'fees': fees[changed],
+    }, index=df.index[changed])
+
+    if periods_per_year is None:
+        periods_per_year = _periods_per_year(df.index)
+    exposed = held != 0
+    volatility = net.std(ddof=1) * np.sqrt(periods_per_year) if len(net) > 1 else np.nan
+    total_return = equity[-1] - 1 if len(equity) else 0.0
+    years = len(net) / periods_per_year if periods_per_year else np.nan
+    metrics = {
+        'total_return': total_return,
+        'annual_return': (1 + total_return) ** (1 / years) - 1 if years and years > 0 else np.nan,
+        'annual_volatility': volatility,
+        'sharpe': net.mean() * periods_per_year / volatility if volatility else np.nan,
+        'max_drawdown': drawdown.min() if len(drawdown) else 0.0,
+        'trades': changed.sum(),
+        'turnover': turnover.sum(),
+        'exposure': exposed.mean() if len(exposed) else 0.0,
+        'hit_rate': (net[exposed] > 0).mean() if exposed.any() else np.nan,
+    }
+    metrics = {name: int(value) if name == 'trades' else float(value) for name, value in metrics.items()}
+    return BacktestResult(frame, trades, metrics, params)
+
+
+_worker_df = None
+
+
+def _init_worker(df: 'pd.DataFrame'):
+    global _worker_df
+    _worker_df = df
+
+
+def _run_worker(signal, params: dict, kwargs: dict) -> dict:
+    return run_backtest(_worker_df, signal, **kwargs, **params).metrics
+
+
+def parameter_grid(grid: dict) -> List[dict]:
+
+    """
+
+    :param grid: {'fast': [5, 10], 'slow': [50, 100]}
+    :return: every combination, [{'fast': 5, 'slow': 50}, {'fast': 5, 'slow': 100}, ...]
+    """
+
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def run_grid(
+        df: 'pd.DataFrame',
+        signal: Callable[..., Union['pd.Series', np.ndarray]],
+        params: Union[dict, List[dict]],
+        processes: int = None,
+        fee_bp: float = 10,
+        price_column: str = None,
+        periods_per_year: float = None) -> 'pd.DataFrame':
+
+    """
+    Runs one backtest per parameter set on a process pool. The DataFrame is sent to every worker once; the signal
+    has to be a module-level function so it can be pickled.
+
+    :param params: list of keyword dicts for the signal, or a dict of lists expanded with parameter_grid
+    :param processes: pool size, defaults to the number of CPUs, 1 runs everything in this process
+    :return: one row of metrics per parameter set
+    """
+
+    import pandas as pd
+
+    if isinstance(params, dict):
+        params = parameter_grid(params)
+    kwargs = {'fee_bp': fee_bp, 'price_column': price_column, 'periods_per_year': periods_per_year}
+    if processes == 1:
+        metrics = [run_backtest(df, signal, **kwargs, **p).metrics for p in params]
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(df,)) as pool:
+            metrics = list(pool.map(_run_worker, itertools.repeat(signal), params, itertools.repeat(kwargs)))
+    return pd.concat([pd.DataFrame(params), pd.DataFrame(metrics)], axis=1)
@@ -0,0 +1,180 @@
+"""
+Benchmarks every public BlockSize method against a local MockAPIServer.
+
+    python -m quant_sdk_lite.benchmark --rows 5000 --repeat 50 --latency 0.002
+    python -m quant_sdk_lite.benchmark --json before.json
+    python -m quant_sdk_lite.benchmark --baseline before.json --tolerance 0.2
+
+With --baseline the run exits with status 1 when the median of any method is more than `tolerance` slower than in the
+baseline, so it can guard releases against performance regressions.
+"""
+
+import sys
+import json
+import time
+import argparse
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from .quantsdk import BlockSize
+from . import decode
+from .transport import Transport
+from .metrics import Instrumentation, PHASES
+from .mockapi import MockAPIServer
+
+
+def cases(sdk: BlockSize, rows: int, interval: str = '1s') -> Dict[str, Callable[[], object]]:
+
+    """
+
+    :return: {method name: call without arguments}, one entry per public BlockSize method
+    """
+
+    end = int(time.time()) // 60 * 60
+    start = end - rows * int(BlockSize.converter(interval)[:-1])
+    records = sdk.get_historic_records('vwap', 'BTC', 'EUR', interval, start, end)
+    order_id = sdk.post_market_order('BTC', 'EUR', 'BUY', 0.01)['order']['order_id']
+    return {
+        'get_orderbook_data': lambda: sdk.get_orderbook_data(['BINANCE', 'KRAKEN'], 'BTC', 'EUR', 50),
+        'get_orderbook': lambda: sdk.get_orderbook(['BINANCE', 'KRAKEN'], 'BTC', 'EUR', 50),
+        'get_vwap': lambda: sdk.get_vwap('BTC', 'EUR', '1m'),
+        'get_ohlc': lambda: sdk.get_ohlc('BTC', 'EUR', '1m'),
+        'get_historic_vwap': lambda: sdk.get_historic_vwap('BTC', 'EUR', interval, start, end),
+        'get_historic_ohlc': lambda: sdk.get_historic_ohlc('BTC', 'EUR', interval, start, end),
+        'get_historic_records': lambda: sdk.get_historic_records('ohlc', 'BTC', 'EUR', interval, start, end),
+        'decode_historic': lambda: decode.to_frame(decode.decode_records('vwap', records)),
+        'post_simulated_order': lambda: sdk.post_simulated_order('BTC', 'EUR', 'BUY', 0.5, ['BINANCE', 'KRAKEN']),
+        'post_market_order': lambda: sdk.post_market_order('BTC', 'EUR', 'BUY', 0.01),
+        'order_status': lambda: sdk.order_status(order_id),
+        'order_logs': lambda: sdk.order_logs(order_id),
+        'get_exchange_balances': lambda: sdk.get_exchange_balances(),
+        'converter': lambda: BlockSize.converter('60m'),
+    }
+
+
+def measure(call: Callable[[], object], repeat: int, warmup: int = 2) -> dict:
+    for _ in range(warmup):
+        call()
+    timings = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter()
+        call()
+        timings[i] = time.perf_counter() - start
+    return {
+        'min': float(timings.min()),
+        'median': float(np.median(timings)),
+        'p95': float(np.percentile(timings, 95)),
+        'mean': float(timings.mean()),
+    }
+
+
+def run(rows: int = 5000, repeat: int = 20, latency: float = 0.0, depth: int = 50,
+        methods: List[str] = None, instrumentation: Instrumentation = None) -> dict:
+
+    """
+
+    :param rows: bars per historic response
+    :param repeat: timed calls per method
+    :param latency: seconds the mock server waits before every response
+    :param depth: order book levels per side and exchange
+    :param methods: names of the methods to run, all when omitted
+    :param instrumentation: collects the per-endpoint metrics of the timed calls, a new one when omitted
+    :return: {'methods': {name: timings}, 'endpoints': Instrumentation.to_dict(), 'settings': ...}
+    """
+
+    if instrumentation is None:
+        instrumentation = Instrumentation()
+    with MockAPIServer(rows=rows, depth=depth, latency=latency, seed=0) as server:
+        transport = Transport('benchmark', base_url=server.url, instrumentation=instrumentation)
+        sdk = BlockSize('benchmark', transport=transport)
+        try:
+            selected = cases(sdk, rows)
+            if methods:
+                unknown = set(methods) - set(selected)
+                if unknown:
+                    raise ValueError(f'Unknown method(s): {", ".join(sorted(unknown))}')
+                selected = {name: selected[name] for name in methods}
+            instrumentation.reset()
+            results = {name: measure(call, repeat) for name, call in selected.items()}
+        finally:
+            transport.close()
+    return {
+        'methods': results,
+        'endpoints': instrumentation.to_dict(),
+        'settings': {'rows': rows, 'repeat': repeat, 'latency': latency, 'depth': depth},
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> List[str]:
+
+    """
+
+    :return: one line per method whose median is more than `tolerance` (0.2 = 20%) slower than in the baseline
+    """
+
+    regressions = []
+    for name, timings in result['methods'].items():
+        before = baseline.get('methods', {}).get(name)
+        if before is None or before['median'] <= 0:
+            continue
+        change = timings['median'] / before['median'] - 1
+        if change > tolerance:
+            regressions.append(f'{name}: {before["median"] * 1e3:.3f} ms -> {timings["median"] * 1e3:.3f} ms '
+                               f'({change:+.0%})')
+    return regressions
+
+
+def report(result: dict) -> str:
+    lines = [f'{"method":<24}{"min ms":>10}{"median ms":>12}{"p95 ms":>10}']
+    for name, timings in result['methods'].items():
+        lines.append(f'{name:<24}{timings["min"] * 1e3:>10.3f}{timings["median"] * 1e3:>12.3f}'
+                     f'{timings["p95"] * 1e3:>10.3f}')
+    lines.append('')
+    lines.append(f'{"endpoint":<26}{"requests":>9}{"KiB/req":>9}' + ''.join(f'{phase + " ms":>12}' for phase in PHASES))
+    for endpoint, stats in result['endpoints'].items():
+        requests = stats['requests']
+        line = f'{endpoint:<26}{requests:>9}{stats["bytes"] / 1024 / max(requests, 1):>9.1f}'
+        for phase in PHASES:
+            histogram = stats['phases'].get(phase)
+            mean = histogram['sum'] / histogram['count'] * 1e3 if histogram and histogram['count'] else float('nan')
+            line += f'{mean:>12.3f}'
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m quant_sdk_lite.benchmark',
+                                     description='Benchmark BlockSize against a local mock API.')
+    parser.add_argument('--rows', type=int, default=5000, help='bars per historic response')
+    parser.add_argument('--repeat', type=int, default=20, help='timed calls per method')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every mock response')
+    parser.add_argument('--depth', type=int, default=50, help='order book levels per side and exchange')
+    parser.add_argument('--method', action='append', dest='methods', help='run only this method, repeatable')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--prometheus', help='write the endpoint metrics in Prometheus text format to this file')
+    parser.add_argument('--baseline', help='results of an earlier run written with --json')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown against the baseline')
+    args = parser.parse_args(argv)
+
+    instrumentation = Instrumentation()
+    result = run(args.rows, args.repeat, args.latency, args.depth, args.methods, instrumentation)
+    print(report(result))
+
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(result, fh, indent=2)
+    if args.prometheus:
+        with open(args.prometheus, 'w') as fh:
+            fh.write(instrumentation.to_prometheus())
+    if args.baseline:
+        with open(args.baseline, 'r') as fh:
+            regressions = compare(result, json.load(fh), args.tolerance)
+        if regressions:
+            print('\nRegressions:\n' + '\n'.join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+class _Call:
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ResponseCache:
+
+    """
+    Thread-safe LRU cache with per-entry expiry. Concurrent lookups of the same missing key share a single call of
+    the fetch function. Cached responses are shared between callers and should not be modified.
+    """
+
+    DEFAULT_TTLS = {
+        'orderbook': 1.0,
+    }
+
+    def __init__(self, maxsize: int = 1024, ttls: dict = None):
+
+        """
+
+        :param maxsize: number of entries kept before the least recently used one is dropped
+        :param ttls: seconds per endpoint (vwap, ohlc, orderbook), vwap and ohlc default to the rest of their bar
+        """
+
+        self.maxsize = maxsize
+        self.ttls = dict(self.DEFAULT_TTLS, **(ttls or {}))
+        self._entries = OrderedDict()
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def ttl(self, endpoint: str, interval_seconds: float = None, now: float = None) -> float:
+
+        """
+
+        :param interval_seconds: bar interval of vwap and ohlc values, their entries expire at the next bar boundary at
+        the latest so a cached bar is never served once a newer one can be published
+        :param now: Unix time, defaults to the current time
+        :return: seconds a fetched value may be served from the cache
+        """
+
+        ttl = self.ttls.get(endpoint)
+        if interval_seconds is None:
+            return ttl if ttl is not None else 0.0
+        now = time.time() if now is None else now
+        remaining = (now // interval_seconds + 1) * interval_seconds - now
+        return remaining if ttl is None else min(ttl, remaining)
+
+    def get_or_fetch(self, key: Hashable, ttl: float, fetch: Callable[[], object],
+                     cacheable: Callable[[object], bool] = None):
+
+        """
+
+        :param fetch: called without arguments when the key is missing or expired
+        :param cacheable: called with the fetched result, which is only stored when it returns True, e.g. to skip
+        error responses; concurrent callers waiting for this fetch still receive the result
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.misses += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fetch()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.error is None and ttl > 0 and (cacheable is None or cacheable(call.result)):
+                    self._entries[key] = (time.monotonic() + ttl, call.result)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+            call.event.set()
+        return call.result
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'size': len(self._entries),
+            }
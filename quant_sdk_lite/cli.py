@@ -0,0 +1,309 @@
+"""
+Bulk export of historical VWAP / OHLC bars to partitioned Parquet or CSV files.
+
+    quantsdk-export --pairs BTC/EUR ETH/EUR --intervals 1m 5m --start 2020-09-01 --end 2020-10-01 --out export
+
+Every (endpoint, pair, interval) is downloaded window by window into one file per UTC day,
+<out>/endpoint=<endpoint>/pair=<pair>/interval=<seconds>s/date=<YYYY-MM-DD>/part-<YYYY-MM-DD>.<format>, and a day is
+written as soon as its last window has arrived, so memory stays bounded by a window plus a day per worker. The ranges
+written are recorded in _coverage.json next to the data; running an export again, with any window size or range, only
+fetches what is missing and merges it into the existing day files. The SDK, NumPy and pyarrow are only imported once
+the arguments have been parsed.
+"""
+
+import os
+import sys
+import json
+import time
+import calendar
+import datetime
+import argparse
+import threading
+from typing import List, Tuple
+
+FORMATS = ('parquet', 'csv')
+COVERAGE = '_coverage.json'
+DAY = 24 * 60 * 60
+
+
+def parse_time(value: str) -> int:
+
+    """
+
+    :param value: Unix time stamp, YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS, dates are UTC
+    """
+
+    if value.lstrip('-').isdigit():
+        return int(value)
+    for pattern in ('%Y-%m-%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S'):
+        try:
+            return calendar.timegm(datetime.datetime.strptime(value, pattern).timetuple())
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(f'Invalid time {value}, expected a Unix time stamp or YYYY-MM-DD[THH:MM:SS]')
+
+
+def parse_pair(value: str) -> Tuple[str, str]:
+    for separator in ('/', '-', '_', ':'):
+        if separator in value:
+            base, quote = value.split(separator, 1)
+            if base and quote:
+                return base.upper(), quote.upper()
+    raise argparse.ArgumentTypeError(f'Invalid pair {value}, expected BASE/QUOTE, e.g. BTC/EUR')
+
+
+def partition_dir(out: str, endpoint: str, pair: str, interval: str, day: int = None) -> str:
+    path = os.path.join(out, f'endpoint={endpoint}', f'pair={pair}', f'interval={interval}')
+    if day is not None:
+        path = os.path.join(path, 'date=' + time.strftime('%Y-%m-%d', time.gmtime(day)))
+    return path
+
+
+def write_part(path: str, endpoint: str, columns: dict, file_format: str):
+
+    """
+    Writes one chunk of decoded columns (see decode.decode_records) atomically to path.
+    """
+
+    import numpy as np
+    from .decode import FIELDS, to_arrow
+
+    fields = ('timestamp',) + FIELDS[endpoint]
+    columns = {field: columns[field] for field in fields}
+    tmp = path + '.tmp'
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+
+        pq.write_table(to_arrow(columns), tmp)
+    else:
+        with open(tmp, 'w') as fh:
+            fh.write(','.join(fields) + '\n')
+            values = np.column_stack([columns[field].astype(np.float64) for field in fields])
+            np.savetxt(fh, values, fmt=['%d'] + ['%.17g'] * len(FIELDS[endpoint]), delimiter=',')
+    os.replace(tmp, path)
+
+
+def read_part(path: str, endpoint: str, file_format: str) -> dict:
+    import numpy as np
+    from .decode import FIELDS
+
+    fields = ('timestamp',) + FIELDS[endpoint]
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path, columns=list(fields))
+        columns = {field: table.column(field).to_numpy() for field in fields}
+    else:
+        values = np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2, dtype=np.float64)
+        columns = {field: values[:, i] for i, field in enumerate(fields)}
+    columns['timestamp'] = columns['timestamp'].astype(np.int64)
+    return columns
+
+
+def read_coverage(series_dir: str) -> List[Tuple[int, int]]:
+    try:
+        with open(os.path.join(series_dir, COVERAGE), 'r') as fh:
+            return [tuple(r) for r in json.load(fh)]
+    except FileNotFoundError:
+        return []
+
+
+def write_coverage(series_dir: str, ranges: List[Tuple[int, int]]):
+    from .store import merge_ranges
+
+    tmp = os.path.join(series_dir, COVERAGE + '.tmp')
+    with open(tmp, 'w') as fh:
+        json.dump(merge_ranges(ranges), fh)
+    os.replace(tmp, os.path.join(series_dir, COVERAGE))
+
+
+class Exporter:
+
+    def __init__(self, sdk, out: str, file_format: str = 'parquet', max_points: int = 5000, workers: int = 4,
+                 retries: int = 3, quiet: bool = False):
+
+        """
+
+        :param sdk: BlockSize client used for the downloads
+        :param out: root directory of the partitioned files
+        :param file_format: parquet or csv
+        :param max_points: bars per window, i.e. per request
+        :param workers: (endpoint, pair, interval) combinations exported in parallel
+        :param retries: attempts per window after the first one
+        :param quiet: do not report progress on stderr
+        """
+
+        from .history import HistoricDownloader
+
+        if file_format not in FORMATS:
+            raise ValueError(f'Unknown format {file_format}, expected one of {", ".join(FORMATS)}')
+        self.out = out
+        self.file_format = file_format
+        self.workers = workers
+        self.quiet = quiet
+        self.downloader = HistoricDownloader(sdk, max_points=max_points, workers=1, retries=retries)
+        self._lock = threading.Lock()
+
+    def log(self, message: str):
+        if not self.quiet:
+            with self._lock:
+                print(message, file=sys.stderr, flush=True)
+
+    def export_one(self, endpoint: str, base: str, quote: str, interval: str, start_date: int, end_date: int) -> int:
+
+        """
+        Downloads the parts of [start_date, end_date] that are not covered yet. Ranges closer to now than one interval
+        are written but not marked as covered, since the server may still add bars there.
+
+        :return: number of bars written
+        """
+
+        from .quantsdk import BlockSize
+        from .decode import decode_records, sort_unique
+        from .store import missing_ranges
+
+        pair = base + quote
+        seconds = BlockSize.converter(interval)
+        series_dir = partition_dir(self.out, endpoint, pair, seconds)
+        os.makedirs(series_dir, exist_ok=True)
+        settled = int(time.time()) - int(seconds[:-1])
+        windows = []
+        for gap_start, gap_end in missing_ranges(read_coverage(series_dir), start_date, end_date):
+            for window in self.downloader.windows(interval, gap_start, gap_end):
+                # neighbouring windows share their boundary, each bar belongs to the window starting at it
+                windows.append((window, (window[0], window[1] if window[1] == gap_end else window[1] - 1)))
+
+        pending, fetched, rows = [], [], 0
+        for number, (window, (first, last)) in enumerate(windows, 1):
+            records = self.downloader.fetch_window(endpoint, base, quote, interval, window)
+            columns = sort_unique(decode_records(endpoint, records))
+            del records
+            keep = (columns['timestamp'] >= first) & (columns['timestamp'] <= last)
+            if not keep.all():
+                columns = {field: values[keep] for field, values in columns.items()}
+            pending.append(columns)
+            fetched.append((first, last))
+            rows += len(columns['timestamp'])
+            # every day before the one the next window starts in is complete
+            cutoff = windows[number][1][0] // DAY * DAY if number < len(windows) else None
+            pending, fetched = self._flush(endpoint, series_dir, pending, fetched, cutoff, settled)
+            self.log(f'{endpoint} {pair} {seconds}: window {number}/{len(windows)}, {rows} bars')
+        return rows
+
+    def _flush(self, endpoint: str, series_dir: str, pending: list, fetched: list, cutoff: int, settled: int) -> tuple:
+
+        """
+        Merges the pending bars before cutoff (all of them if cutoff is None) into their day files and marks the
+        fetched ranges before cutoff as covered.
+
+        :return: the pending bars and fetched ranges from cutoff on
+        """
+
+        import numpy as np
+        from .decode import concat_columns, sort_unique
+
+        columns = concat_columns(endpoint, pending)
+        timestamps = columns['timestamp']
+        split = len(timestamps) if cutoff is None else int(np.searchsorted(timestamps, cutoff))
+        days = timestamps[:split] // DAY * DAY
+        bounds = np.concatenate(([0], np.flatnonzero(days[1:] != days[:-1]) + 1, [split]))
+        for first, last in zip(bounds[:-1], bounds[1:]):
+            if first == last:
+                continue
+            date = time.strftime('%Y-%m-%d', time.gmtime(int(days[first])))
+            directory = os.path.join(series_dir, 'date=' + date)
+            path = os.path.join(directory, f'part-{date}.{self.file_format}')
+            part = {field: values[first:last] for field, values in columns.items()}
+            if os.path.exists(path):
+                old = read_part(path, endpoint, self.file_format)
+                part = sort_unique(concat_columns(endpoint, [old, part]))
+            os.makedirs(directory, exist_ok=True)
+            write_part(path, endpoint, part, self.file_format)
+
+        limit = settled if cutoff is None else min(settled, cutoff - 1)
+        covered = [(first, min(last, limit)) for first, last in fetched if first <= limit]
+        if covered:
+            write_coverage(series_dir, read_coverage(series_dir) + covered)
+        if cutoff is None:
+            return [], []
+        rest = {field: values[split:] for field, values in columns.items()}
+        return [rest], [(max(first, cutoff), last) for first, last in fetched if last >= cutoff]
+
+    def export(self, endpoints: List[str], pairs: List[Tuple[str, str]], intervals: List[str], start_date: int,
+               end_date: int) -> dict:
+
+        """
+
+        :return: {(endpoint, pair, interval): bars written or the exception that stopped the export}
+        """
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        jobs = [(endpoint, base, quote, interval) for endpoint in endpoints for base, quote in pairs
+                for interval in intervals]
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {job: pool.submit(self.export_one, *job, start_date, end_date) for job in jobs}
+            for (endpoint, base, quote, interval), future in futures.items():
+                try:
+                    results[(endpoint, base + quote, interval)] = future.result()
+                except Exception as e:
+                    self.log(f'{endpoint} {base + quote} {interval}: failed with {e!r}')
+                    results[(endpoint, base + quote, interval)] = e
+        return results
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='quantsdk-export',
+                                     description='Export historical VWAP / OHLC bars to partitioned files.')
+    parser.add_argument('--pairs', nargs='+', type=parse_pair, required=True, help='e.g. BTC/EUR ETH/EUR')
+    parser.add_argument('--intervals', nargs='+', default=['1m'], help='e.g. 1s 1m 5m 1h (default 1m)')
+    parser.add_argument('--endpoints', nargs='+', choices=('vwap', 'ohlc'), default=['ohlc'],
+                        help='vwap and/or ohlc (default ohlc)')
+    parser.add_argument('--start', type=parse_time, required=True, help='Unix time stamp or YYYY-MM-DD (UTC)')
+    parser.add_argument('--end', type=parse_time, default=None, help='Unix time stamp or YYYY-MM-DD (UTC), default now')
+    parser.add_argument('--out', default='.', help='root directory of the export (default .)')
+    parser.add_argument('--format', choices=FORMATS, default='parquet', dest='file_format',
+                        help='parquet (requires pyarrow) or csv (default parquet)')
+    parser.add_argument('--workers', type=int, default=4, help='combinations exported in parallel (default 4)')
+    parser.add_argument('--window', type=int, default=5000, help='bars per request (default 5000)')
+    parser.add_argument('--retries', type=int, default=3, help='attempts per window after the first (default 3)')
+    parser.add_argument('--token', default=os.environ.get('BLOCKSIZE_TOKEN'),
+                        help='API token, defaults to the BLOCKSIZE_TOKEN environment variable')
+    parser.add_argument('--base-url', default='https://api.blocksize.capital/v1', help='API root')
+    parser.add_argument('--quiet', action='store_true', help='do not report progress')
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.token:
+        parser.error('an API token is required, pass --token or set BLOCKSIZE_TOKEN')
+    end_date = args.end if args.end is not None else int(time.time())
+    if end_date <= args.start:
+        parser.error('--end must be after --start')
+    if args.file_format == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error('--format parquet requires pyarrow, install it or use --format csv')
+
+    from .quantsdk import BlockSize
+    from .transport import Transport
+
+    transport = Transport(args.token, base_url=args.base_url, pool_maxsize=max(args.workers, 1))
+    sdk = BlockSize(args.token, transport=transport)
+    exporter = Exporter(sdk, args.out, args.file_format, args.window, args.workers, args.retries, args.quiet)
+    try:
+        results = exporter.export(args.endpoints, args.pairs, args.intervals, args.start, end_date)
+    finally:
+        transport.close()
+    failed = [key for key, result in results.items() if isinstance(result, Exception)]
+    exporter.log(f'{sum(result for result in results.values() if not isinstance(result, Exception))} bars written, '
+                 f'{len(failed)} of {len(results)} exports failed')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
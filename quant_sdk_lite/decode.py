@@ -0,0 +1,149 @@
+import json
+import numpy as np
+from typing import Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FIELDS = {
+    'vwap': ('price', 'volume'),
+    'ohlc': ('open', 'high', 'low', 'close'),
+}
+
+
+def loads(body: Union[bytes, str]):
+
+    """
+    Parses a JSON body with orjson when it is installed, otherwise with the standard library.
+    """
+
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def column_name(field: str) -> str:
+    return 'Time' if field == 'timestamp' else field.capitalize()
+
+
+def empty_columns(endpoint: str) -> dict:
+    columns = {'timestamp': np.empty(0, dtype=np.int64)}
+    columns.update((field, np.empty(0, dtype=np.float64)) for field in FIELDS[endpoint])
+    return columns
+
+
+def decode_records(endpoint: str, records: list) -> dict:
+
+    """
+    Converts the records of a historic endpoint into one typed array per field: int64 seconds for timestamp,
+    float64 for the prices and volumes. Fields the endpoint is not known to send are kept as they come.
+
+    :return: {'timestamp': ..., 'price': ..., ...}
+    """
+
+    if not records:
+        return empty_columns(endpoint)
+    if not isinstance(records, list):
+        raise ValueError(f'Unexpected response: {records}')
+    count = len(records)
+    columns = {'timestamp': np.fromiter((record['timestamp'] for record in records), dtype=np.int64, count=count)}
+    for field in FIELDS[endpoint]:
+        columns[field] = np.fromiter((record[field] for record in records), dtype=np.float64, count=count)
+    for field in records[0]:
+        if field not in columns:
+            columns[field] = np.asarray([record.get(field) for record in records])
+    return columns
+
+
+def concat_columns(endpoint: str, parts: list) -> dict:
+    parts = [part for part in parts if len(part['timestamp'])]
+    if not parts:
+        return empty_columns(endpoint)
+    if len(parts) == 1:
+        return parts[0]
+    return {field: np.concatenate([part[field] for part in parts])
+            for field in parts[0] if all(field in part for part in parts)}
+
+
+def sort_unique(columns: dict) -> dict:
+
+    """
+    Sorts by timestamp and drops duplicate timestamps, keeping the row that came last.
+    """
+
+    timestamps = columns['timestamp']
+    order = np.argsort(timestamps, kind='stable')
+    ordered = timestamps[order]
+    keep = np.ones(len(ordered), dtype=bool)
+    keep[:-1] = ordered[:-1] != ordered[1:]
+    if keep.all() and (order[1:] > order[:-1]).all():
+        return columns
+    order = order[keep]
+    return {field: values[order] for field, values in columns.items()}
+
+
+def to_frame(columns: dict) -> 'pd.DataFrame':
+
+    """
+    Builds the DataFrame returned by get_historic_vwap / get_historic_ohlc, indexed by a datetime64 Time index.
+    The arrays are used as they are, without copying.
+    """
+
+    import pandas as pd
+
+    index = pd.DatetimeIndex(np.asarray(columns['timestamp'], dtype=np.int64).view('datetime64[s]'),
+                             copy=False, name='Time')
+    data = {column_name(field): values for field, values in columns.items() if field != 'timestamp'}
+    return pd.DataFrame(data, index=index, copy=False)
+
+
+def to_structured(columns: dict) -> np.ndarray:
+
+    """
+
+    :return: NumPy structured array with one record per bar
+    """
+
+    array = np.empty(len(columns['timestamp']), dtype=[(field, values.dtype) for field, values in columns.items()])
+    for field, values in columns.items():
+        array[field] = values
+    return array
+
+
+def to_arrow(columns: dict):
+
+    """
+
+    :return: pyarrow.Table with a timestamp[s] column, requires pyarrow
+    """
+
+    import pyarrow as pa
+
+    arrays = {field: pa.array(values) for field, values in columns.items() if field != 'timestamp'}
+    timestamps = pa.array(np.asarray(columns['timestamp'], dtype=np.int64).view('datetime64[s]'))
+    return pa.table(dict(timestamp=timestamps, **arrays))
+
+
+OUTPUTS = {
+    'pandas': to_frame,
+    'numpy': to_structured,
+    'arrow': to_arrow,
+    'columns': lambda columns: columns,
+}
+
+
+def convert(columns: dict, output: str = 'pandas'):
+
+    """
+
+    :param output: pandas (DataFrame), numpy (structured array), arrow (pyarrow.Table) or columns (dict of arrays)
+    """
+
+    if output not in OUTPUTS:
+        raise ValueError(f'Unknown output {output}, expected one of {", ".join(OUTPUTS)}')
+    return OUTPUTS[output](columns)
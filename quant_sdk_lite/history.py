@@ -0,0 +1,228 @@
+import os
+import json
+import time
+import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Tuple, Optional, TYPE_CHECKING
+
+from .quantsdk import BlockSize
+from . import decode
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class DownloadError(Exception):
+
+    def __init__(self, failed: List[Tuple[int, int]], errors: List[Exception]):
+        super().__init__(f'{len(failed)} window(s) failed, first error: {errors[0]!r}')
+        self.failed = failed
+        self.errors = errors
+
+
+class DownloadCheckpoint:
+
+    """
+    Directory of finished windows, one JSON file each, so an interrupted download can be resumed
+    by passing the same checkpoint again. A checkpoint belongs to one (endpoint, pair, interval), which is recorded in
+    checkpoint.json when it is first used.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def bind(self, endpoint: str, pair: str, interval: str):
+
+        """
+        Records the series this checkpoint belongs to, or checks that it matches the recorded one.
+
+        :raises ValueError: the checkpoint holds windows of another endpoint, pair or interval
+        """
+
+        key = {'endpoint': endpoint, 'pair': pair, 'interval': BlockSize.converter(interval)}
+        file = os.path.join(self.path, 'checkpoint.json')
+        try:
+            with open(file, 'r') as fh:
+                recorded = json.load(fh)
+        except FileNotFoundError:
+            recorded = None
+        if recorded is None:
+            with open(file + '.tmp', 'w') as fh:
+                json.dump(key, fh)
+            os.replace(file + '.tmp', file)
+        elif recorded != key:
+            raise ValueError(f'Checkpoint {self.path} belongs to {recorded["endpoint"]} {recorded["pair"]} '
+                             f'{recorded["interval"]}, not {endpoint} {pair} {key["interval"]}')
+
+    def _file(self, window: Tuple[int, int]) -> str:
+        return os.path.join(self.path, f'{window[0]}_{window[1]}.json')
+
+    def load(self, window: Tuple[int, int]) -> Optional[list]:
+        try:
+            with open(self._file(window), 'r') as fh:
+                return json.load(fh)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def save(self, window: Tuple[int, int], records: list):
+        tmp = self._file(window) + '.tmp'
+        with open(tmp, 'w') as fh:
+            json.dump(records, fh)
+        os.replace(tmp, self._file(window))
+
+    def done(self) -> List[Tuple[int, int]]:
+        windows = []
+        for name in os.listdir(self.path):
+            if name.endswith('.json') and name != 'checkpoint.json':
+                start, end = name[:-len('.json')].split('_')
+                windows.append((int(start), int(end)))
+        return sorted(windows)
+
+
+class HistoricDownloader:
+
+    def __init__(
+            self,
+            sdk: BlockSize,
+            max_points: int = 5000,
+            workers: int = 8,
+            retries: int = 3,
+            backoff: float = 0.5,
+            progress: Callable[[int, int], None] = None):
+
+        """
+
+        :param sdk: client used for the requests, its transport pool should allow `workers` connections
+        :param max_points: number of bars requested per window
+        :param workers: windows fetched in parallel
+        :param retries: attempts per window after the first one
+        :param backoff: base delay in seconds between attempts, doubled on every retry
+        :param progress: called with (finished windows, total windows) after every window
+        """
+
+        self.sdk = sdk
+        self.max_points = max_points
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.progress = progress
+
+    def windows(self, interval: str, start_date: int, end_date: int) -> List[Tuple[int, int]]:
+
+        """
+        Splits [start_date, end_date] into windows of `max_points` bars. Both ends are inclusive, neighbouring windows
+        share their boundary, and a range with start_date == end_date is a single window.
+        """
+
+        if end_date < start_date:
+            return []
+        step = int(BlockSize.converter(interval)[:-1]) * self.max_points
+        return [(start, min(start + step, end_date))
+                for start in range(start_date, max(end_date, start_date + 1), step)]
+
+    def fetch_window(self, endpoint: str, base: str, quote: str, interval: str, window: Tuple[int, int]) -> list:
+        for attempt in range(self.retries + 1):
+            try:
+                records = self.sdk.get_historic_records(endpoint, base, quote, interval, window[0], window[1])
+                if records is None:
+                    return []
+                if not isinstance(records, list):
+                    raise ValueError(f'Unexpected response for window {window}: {records}')
+                return records
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt * (0.5 + random.random()))
+
+    def download_records(
+            self,
+            endpoint: str,
+            base: str,
+            quote: str,
+            interval: str,
+            start_date: int,
+            end_date: int,
+            checkpoint: DownloadCheckpoint = None) -> List[list]:
+
+        """
+
+        :return: the records of every window, in window order
+        """
+
+        if checkpoint is not None:
+            checkpoint.bind(endpoint, (base + quote).upper(), interval)
+        windows = self.windows(interval, start_date, end_date)
+        results = [None] * len(windows)
+        pending = []
+        for i, window in enumerate(windows):
+            if checkpoint is not None:
+                results[i] = checkpoint.load(window)
+            if results[i] is None:
+                pending.append(i)
+
+        finished = len(windows) - len(pending)
+        if self.progress is not None:
+            self.progress(finished, len(windows))
+
+        failed, errors = [], []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.fetch_window, endpoint, base, quote, interval, windows[i]): i
+                       for i in pending}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    failed.append(windows[i])
+                    errors.append(e)
+                    continue
+                if checkpoint is not None:
+                    checkpoint.save(windows[i], results[i])
+                finished += 1
+                if self.progress is not None:
+                    self.progress(finished, len(windows))
+
+        if failed:
+            raise DownloadError(sorted(failed), errors)
+        return results
+
+    def download(
+            self,
+            endpoint: str,
+            base: str,
+            quote: str,
+            interval: str,
+            start_date: int,
+            end_date: int,
+            checkpoint: DownloadCheckpoint = None,
+            output: str = 'pandas') -> 'pd.DataFrame':
+
+        """
+
+        :param endpoint: vwap, ohlc
+        :param base: ETH, BTC
+        :param quote: EUR, USD
+        :param interval: 1s, 5s, 30s, 1m, 5m, 30m, 60m
+        :param start_date: Unix time stamp
+        :param end_date: Unix time stamp
+        :param checkpoint: finished windows are stored here and skipped when downloading again, one checkpoint per
+        endpoint, pair and interval
+        :param output: pandas (DataFrame), numpy (structured array), arrow (pyarrow.Table) or columns (dict of arrays)
+        :return: one DataFrame sorted by time without duplicate timestamps
+        """
+
+        results = self.download_records(endpoint, base, quote, interval, start_date, end_date, checkpoint)
+        parts = []
+        for i, records in enumerate(results):
+            parts.append(decode.decode_records(endpoint, records))
+            results[i] = None
+        return decode.convert(decode.sort_unique(decode.concat_columns(endpoint, parts)), output)
+
+    def download_vwap(self, base: str, quote: str, interval: str, start_date: int, end_date: int,
+                      checkpoint: DownloadCheckpoint = None, output: str = 'pandas') -> 'pd.DataFrame':
+        return self.download('vwap', base, quote, interval, start_date, end_date, checkpoint, output)
+
+    def download_ohlc(self, base: str, quote: str, interval: str, start_date: int, end_date: int,
+                      checkpoint: DownloadCheckpoint = None, output: str = 'pandas') -> 'pd.DataFrame':
+        return self.download('ohlc', base, quote, interval, start_date, end_date, checkpoint, output)
@@ -0,0 +1,275 @@
+import time
+import socket
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Tuple
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NameResolutionError, NewConnectionError, ConnectTimeoutError
+from urllib3.util.connection import allowed_gai_family
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+PHASES = ('dns', 'connect', 'wait', 'download', 'parse', 'build')
+
+_local = threading.local()
+
+
+def endpoint_name(path: str) -> str:
+
+    """
+    Maps a request path to its endpoint, dropping pairs, intervals, order ids and the query, e.g.
+    /data/vwap/historic/BTCEUR/60s?from=1&to=2 -> data/vwap/historic
+    """
+
+    segments = path.split('?', 1)[0].strip('/').split('/')
+    if segments[0] == 'data' and len(segments) > 1 and segments[1] in ('vwap', 'ohlc'):
+        return '/'.join(segments[:3])
+    if segments[0] == 'trading' and 'id' in segments:
+        return 'trading/orders/id/logs' if segments[-1] == 'logs' else 'trading/orders/id'
+    return '/'.join(segments[:3])
+
+
+class Histogram:
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+
+        """
+
+        :return: upper bound of the bucket holding the q-quantile
+        """
+
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += count
+            if seen >= target and count:
+                return bound
+        return float('nan')
+
+    def to_dict(self) -> dict:
+        cumulative, seen = {}, 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += count
+            cumulative[str(bound)] = seen
+        return {'count': self.count, 'sum': self.sum, 'buckets': cumulative}
+
+
+class _TimedConnection:
+
+    """
+    Resolves the host on its own so that name resolution and opening the connection (TCP and TLS) are timed
+    separately, then connects to the resolved addresses in order like urllib3 does.
+    """
+
+    def _new_conn(self) -> socket.socket:
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(host.strip('[]'), self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        finally:
+            _local.dns = getattr(_local, 'dns', 0.0) + time.perf_counter() - start
+        if not addresses:
+            raise NameResolutionError(self.host, self, socket.gaierror('getaddrinfo returned no addresses'))
+
+        error = None
+        for *_, address in addresses:
+            self._dns_host = address[0]
+            try:
+                return super()._new_conn()
+            except (NewConnectionError, ConnectTimeoutError) as e:
+                error = e
+            finally:
+                self._dns_host = host
+        raise error
+
+    def connect(self):
+        dns = getattr(_local, 'dns', 0.0)
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            # time spent resolving the host inside connect() is reported as dns only
+            elapsed = time.perf_counter() - start - (getattr(_local, 'dns', 0.0) - dns)
+            _local.connect = getattr(_local, 'connect', 0.0) + elapsed
+
+
+class _TimedHTTPConnection(_TimedConnection, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnection, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+TIMED_POOL_CLASSES = {'http': _TimedHTTPConnectionPool, 'https': _TimedHTTPSConnectionPool}
+
+
+def take_connect_time() -> Tuple[float, float]:
+
+    """
+
+    :return: seconds this thread spent resolving host names and opening connections (TCP and TLS) since the last call
+    """
+
+    elapsed = getattr(_local, 'dns', 0.0), getattr(_local, 'connect', 0.0)
+    _local.dns = _local.connect = 0.0
+    return elapsed
+
+
+class Instrumentation:
+
+    """
+    Collects per-endpoint latency histograms for each request phase, byte counts and error counters.
+
+    Phases: dns (resolving the host name) and connect (TCP and TLS), both only when a new connection is opened, wait
+    (sending the request until the response headers arrive), download (reading the body), parse (JSON decoding) and
+    build (DataFrame or array construction of the historic endpoints).
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.requests: Dict[str, int] = {}
+        self.bytes: Dict[str, int] = {}
+        self.errors: Dict[Tuple[str, str], int] = {}
+        self.before = []
+        self.after = []
+        self._lock = threading.Lock()
+
+    def add_before(self, hook: Callable[[str, str], None]):
+
+        """
+
+        :param hook: called with (method, path) before every request
+        """
+
+        self.before.append(hook)
+
+    def add_after(self, hook: Callable[[dict], None]):
+
+        """
+
+        :param hook: called with {'endpoint', 'method', 'path', 'status', 'bytes', 'phases', 'error'} after every
+        request
+        """
+
+        self.after.append(hook)
+
+    def request_started(self, method: str, path: str):
+        for hook in self.before:
+            hook(method, path)
+
+    def request_finished(self, method: str, path: str, status: int, size: int, phases: dict, error: str = None):
+        endpoint = endpoint_name(path)
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            self.bytes[endpoint] = self.bytes.get(endpoint, 0) + size
+            for phase, seconds in phases.items():
+                self._observe(endpoint, phase, seconds)
+            if error is None and status is not None and status >= 400:
+                error = f'http_{status}'
+            if error is not None:
+                self.errors[(endpoint, error)] = self.errors.get((endpoint, error), 0) + 1
+        sample = {'endpoint': endpoint, 'method': method, 'path': path, 'status': status, 'bytes': size,
+                  'phases': phases, 'error': error}
+        for hook in self.after:
+            hook(sample)
+
+    def _observe(self, endpoint: str, phase: str, seconds: float):
+        key = (endpoint, phase)
+        if key not in self.histograms:
+            self.histograms[key] = Histogram(self.buckets)
+        self.histograms[key].observe(seconds)
+
+    @contextmanager
+    def phase(self, path: str, phase: str):
+
+        """
+        Times the enclosed block as a phase of the endpoint behind path.
+        """
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._observe(endpoint_name(path), phase, elapsed)
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.requests.clear()
+            self.bytes.clear()
+            self.errors.clear()
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            endpoints = {}
+            for endpoint in sorted(set(self.requests) | {endpoint for endpoint, _ in self.histograms}):
+                endpoints[endpoint] = {
+                    'requests': self.requests.get(endpoint, 0),
+                    'bytes': self.bytes.get(endpoint, 0),
+                    'errors': {kind: count for (name, kind), count in self.errors.items() if name == endpoint},
+                    'phases': {phase: histogram.to_dict() for (name, phase), histogram in self.histograms.items()
+                               if name == endpoint},
+                }
+            return endpoints
+
+    def to_prometheus(self, prefix: str = 'quantsdk') -> str:
+        lines = []
+        with self._lock:
+            lines.append(f'# HELP {prefix}_request_phase_seconds Time spent per request phase.')
+            lines.append(f'# TYPE {prefix}_request_phase_seconds histogram')
+            for (endpoint, phase), histogram in sorted(self.histograms.items()):
+                labels = f'endpoint="{endpoint}",phase="{phase}"'
+                seen = 0
+                for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                    seen += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{prefix}_request_phase_seconds_bucket{{{labels},le="{le}"}} {seen}')
+                lines.append(f'{prefix}_request_phase_seconds_sum{{{labels}}} {histogram.sum}')
+                lines.append(f'{prefix}_request_phase_seconds_count{{{labels}}} {histogram.count}')
+
+            lines.append(f'# HELP {prefix}_requests_total Requests sent.')
+            lines.append(f'# TYPE {prefix}_requests_total counter')
+            for endpoint, count in sorted(self.requests.items()):
+                lines.append(f'{prefix}_requests_total{{endpoint="{endpoint}"}} {count}')
+
+            lines.append(f'# HELP {prefix}_response_bytes_total Response bytes received on the wire.')
+            lines.append(f'# TYPE {prefix}_response_bytes_total counter')
+            for endpoint, count in sorted(self.bytes.items()):
+                lines.append(f'{prefix}_response_bytes_total{{endpoint="{endpoint}"}} {count}')
+
+            lines.append(f'# HELP {prefix}_errors_total Failed requests by kind.')
+            lines.append(f'# TYPE {prefix}_errors_total counter')
+            for (endpoint, kind), count in sorted(self.errors.items()):
+                lines.append(f'{prefix}_errors_total{{endpoint="{endpoint}",kind="{kind}"}} {count}')
+        return '\n'.join(lines) + '\n'
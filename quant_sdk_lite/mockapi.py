@@ -0,0 +1,256 @@
+import gzip
+import json
+import math
+import time
+import zlib
+import uuid
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    wbufsize = -1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.mock.handle(self, 'GET')
+
+    def do_POST(self):
+        self.server.mock.handle(self, 'POST')
+
+
+class MockAPIServer:
+
+    """
+    Local stand-in for the REST API serving synthetic data for every endpoint used by BlockSize. Historic endpoints
+    return up to `rows` bars, order books `depth` levels per side and exchange. Every response is delayed by `latency`
+    seconds (plus up to `jitter`), a share of `error_rate` requests is answered with 503.
+
+    Bars depend only on (seed, pair, interval, timestamp), so overlapping requests return the same values; historic
+    ranges include both ends like the windows of HistoricDownloader.
+    """
+
+    EXCHANGES = ('BINANCE', 'KRAKEN', 'BITSTAMP')
+
+    def __init__(
+            self,
+            host: str = '127.0.0.1',
+            port: int = 0,
+            rows: int = 5000,
+            depth: int = 50,
+            latency: float = 0.0,
+            jitter: float = 0.0,
+            error_rate: float = 0.0,
+            seed: int = None):
+
+        """
+
+        :param host: interface to listen on
+        :param port: 0 picks a free port, see url
+        :param rows: maximum number of bars returned by a historic request
+        :param depth: order book levels per side and exchange
+        :param latency: seconds added to every response
+        :param jitter: up to this many seconds added on top of latency, uniformly distributed
+        :param error_rate: share of requests answered with 503
+        :param seed: makes the generated data, errors and jitter reproducible across processes; without it order book
+        sizes change every second
+        """
+
+        self.host = host
+        self.port = port
+        self.rows = rows
+        self.depth = depth
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.seed = seed
+        self.requests = 0
+        self.orders = {}
+        self._random = random.Random(seed)
+        self._payloads = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.host}:{self.port}/v1'
+
+    def handle(self, handler: BaseHTTPRequestHandler, method: str):
+        with self._lock:
+            self.requests += 1
+            failed = self._random.random() < self.error_rate
+            delay = self.latency + self._random.random() * self.jitter
+        if method == 'POST':
+            length = int(handler.headers.get('Content-Length') or 0)
+            form = parse_qs(handler.rfile.read(length).decode())
+        if delay:
+            time.sleep(delay)
+        if failed:
+            return self._send(handler, 503, b'{"error": "unavailable"}')
+
+        url = urlsplit(handler.path)
+        segments = url.path.strip('/').split('/')[1:]
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        try:
+            if method == 'GET':
+                body = self._get(segments, query)
+            else:
+                body = self._post(segments, {key: values[0] for key, values in form.items()})
+        except (KeyError, IndexError, ValueError):
+            return self._send(handler, 400, b'{"error": "bad request"}')
+        if body is None:
+            return self._send(handler, 404, b'{"error": "not found"}')
+        self._send(handler, 200, body)
+
+    def _send(self, handler: BaseHTTPRequestHandler, status: int, body: bytes):
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        if len(body) > 1024 and 'gzip' in handler.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=1)
+            handler.send_header('Content-Encoding', 'gzip')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _price(self, pair: str) -> float:
+        return 10 + sum(map(ord, pair)) % 97 * 100
+
+    def _get(self, segments: list, query: dict):
+        if segments[:2] == ['data', 'orderbook']:
+            return self._orderbook(query['exchanges'], query['ticker'], int(query['limit']))
+        if segments[0] == 'data' and segments[2] == 'latest':
+            pair, step = segments[3], int(segments[4][:-1])
+            now = int(time.time()) // step * step
+            bars = self._bars(segments[1], pair, step, now, now + step)
+            return json.dumps(dict(bars[0], ticker=pair)).encode()
+        if segments[0] == 'data' and segments[2] == 'historic':
+            pair, step = segments[3], int(segments[4][:-1])
+            key = (segments[1], pair, step, query['from'], query['to'])
+            with self._lock:
+                body = self._payloads.get(key)
+            if body is None:
+                body = json.dumps(self._bars(segments[1], pair, step, int(query['from']), int(query['to']))).encode()
+                with self._lock:
+                    if len(self._payloads) > 64:
+                        self._payloads.clear()
+                    self._payloads[key] = body
+            return body
+        if segments[:3] == ['trading', 'orders', 'id']:
+            with self._lock:
+                order = self.orders.get(segments[3])
+            if order is None:
+                return None
+            if segments[-1] == 'logs':
+                return json.dumps([{'order_id': segments[3], 'message': 'order closed',
+                                    'timestamp': order['order_timestamp']}]).encode()
+            return json.dumps(self._status(order)).encode()
+        if segments[:2] == ['positions', 'exchanges']:
+            return json.dumps([{'exchange': exchange, 'currency': currency, 'total': str(total)}
+                               for exchange in self.EXCHANGES
+                               for currency, total in (('BTC', 1.5), ('ETH', 20), ('EUR', 50000))]).encode()
+        return None
+
+    def _post(self, segments: list, form: dict):
+        if segments[:2] != ['trading', 'orders']:
+            return None
+        order = {
+            'order_id': str(uuid.uuid4()),
+            'base_currency': form['BaseCurrency'],
+            'quote_currency': form['QuoteCurrency'],
+            'direction': 1 if form['Direction'].upper() == 'SELL' else 2,
+            'type': 1,
+            'quantity': form['Quantity'],
+            'order_timestamp': int(time.time() * 1000),
+        }
+        if segments[-1] == 'simulated':
+            price = self._price(form['BaseCurrency'] + form['QuoteCurrency'])
+            notional = price * float(form['Quantity'])
+            return json.dumps({'order': order, 'average_execution_price': str(price),
+                               'trading_fees': str(notional / 1e3), 'elapsed_time_retrieval': 0,
+                               'elapsed_time_calculation': 0, 'trades': []}).encode()
+        with self._lock:
+            self.orders[order['order_id']] = order
+        return json.dumps({'order': order}).encode()
+
+    def _status(self, order: dict) -> dict:
+        price = str(self._price(order['base_currency'] + order['quote_currency']))
+        return {
+            'aggregated_status': 2,
+            'order': order,
+            'orderid': order['order_id'],
+            'trade_status': [{'trade': {'trade_id': order['order_id'], 'exchange': self.EXCHANGES[0],
+                                        'trade_quantity': order['quantity']},
+                              'execution_status': 2,
+                              'status_report': {'trade_status': 3, 'placed_timestamp': order['order_timestamp'],
+                                                'closed_timestamp': order['order_timestamp'],
+                                                'executed_quantity': order['quantity'], 'executed_price': price}}],
+        }
+
+    def _noise(self, *key) -> float:
+
+        """
+
+        :return: number in [0, 1) that only depends on the seed and key, independent of the process hash seed
+        """
+
+        return zlib.crc32(':'.join(map(str, (self.seed,) + key)).encode()) / 2 ** 32
+
+    def _price_at(self, pair: str, step: int, timestamp: int) -> float:
+        trend = 0.02 * math.sin(timestamp / 3600)
+        return self._price(pair) * (1 + trend + 0.002 * (self._noise(pair, step, timestamp) - 0.5))
+
+    def _bars(self, endpoint: str, pair: str, step: int, start: int, end: int) -> list:
+        start = (start + step - 1) // step * step
+        count = min(self.rows, (end - start) // step + 1) if start <= end else 0
+        bars = []
+        for timestamp in range(start, start + count * step, step):
+            opening, closing = self._price_at(pair, step, timestamp), self._price_at(pair, step, timestamp + step)
+            noise = self._noise(pair, step, timestamp, 'bar')
+            if endpoint == 'vwap':
+                bars.append({'timestamp': timestamp, 'price': (opening + closing) / 2, 'volume': noise * 10})
+            else:
+                bars.append({'timestamp': timestamp, 'open': opening, 'high': max(opening, closing) * (1 + noise / 2e3),
+                             'low': min(opening, closing) * (1 - noise / 2e3), 'close': closing})
+        return bars
+
+    def _orderbook(self, exchanges: str, pair: str, depth: int) -> bytes:
+        names = [name for name in exchanges.split(',') if name and name != 'None'] or list(self.EXCHANGES)
+        mid = self._price(pair)
+        levels = min(depth, self.depth)
+        epoch = int(time.time()) if self.seed is None else 0
+        books = []
+        for name in names:
+            bids = [[str(mid * (1 - 1e-4 * (i + 1))), str(self._noise(pair, name, epoch, 'bid', i))]
+                    for i in range(levels)]
+            asks = [[str(mid * (1 + 1e-4 * (i + 1))), str(self._noise(pair, name, epoch, 'ask', i))]
+                    for i in range(levels)]
+            books.append({'exchange': name.upper(), 'ticker': pair, 'bids': bids, 'asks': asks})
+        return json.dumps(books).encode()
+
+    def start(self) -> 'MockAPIServer':
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.mock = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,89 @@
+import json
+import time
+import random
+import asyncio
+import websockets
+
+
+class MockStreamServer:
+
+    """
+    Local stand-in for the streaming endpoint. Every subscription receives synthetic updates at `rate` messages per
+    second. `drop_after` closes each connection after that many messages, which exercises reconnecting clients.
+    `malformed_after` sends one frame that is not valid JSON on each connection after that many messages.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, rate: float = 100, drop_after: int = None,
+                 seed: int = None, malformed_after: int = None):
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.drop_after = drop_after
+        self.malformed_after = malformed_after
+        self.connections = 0
+        self.sent = 0
+        self._random = random.Random(seed)
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f'ws://{self.host}:{self.port}'
+
+    def _message(self, subscription: dict, price: float) -> dict:
+        now = time.time()
+        message = {'channel': subscription['channel'], 'ticker': subscription['ticker'], 'timestamp': now}
+        if subscription['channel'] == 'vwap':
+            message.update(price=price, volume=self._random.random())
+        elif subscription['channel'] == 'ohlc':
+            message.update(open=price, high=price * 1.001, low=price * 0.999, close=price)
+        else:
+            message.update(exchange='MOCK',
+                           bids=[[str(price * 0.9995), str(self._random.random())]],
+                           asks=[[str(price * 1.0005), str(self._random.random())]])
+        return message
+
+    async def _handler(self, websocket):
+        self.connections += 1
+        subscriptions = []
+        sent = 0
+
+        async def receive():
+            async for raw in websocket:
+                message = json.loads(raw)
+                if message.get('action') == 'subscribe':
+                    subscriptions.append(message)
+
+        receiver = asyncio.ensure_future(receive())
+        price = 100.0
+        try:
+            while not receiver.done():
+                for subscription in list(subscriptions):
+                    price *= 1 + self._random.gauss(0, 0.0005)
+                    await websocket.send(json.dumps(self._message(subscription, price)))
+                    sent += 1
+                    self.sent += 1
+                    if sent == self.malformed_after:
+                        await websocket.send('{"channel": ')
+                    if self.drop_after is not None and sent >= self.drop_after:
+                        await websocket.close()
+                        return
+                await asyncio.sleep(1 / self.rate)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            receiver.cancel()
+
+    async def start(self):
+        self._server = await websockets.serve(self._handler, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
@@ -0,0 +1,219 @@
+import numpy as np
+from typing import List, Union, Iterable
+
+BOUNDARY_TOLERANCE = 1e-12
+
+
+class OrderBook:
+
+    """
+    Consolidated order book held in contiguous arrays. Bids are sorted best (highest) first and asks best (lowest)
+    first; each level keeps the index of its exchange in `exchanges`. Quantity arguments of the query methods may be
+    scalars or arrays and are evaluated for all values at once.
+    """
+
+    def __init__(
+            self,
+            bid_prices: np.ndarray,
+            bid_sizes: np.ndarray,
+            bid_exchanges: np.ndarray,
+            ask_prices: np.ndarray,
+            ask_sizes: np.ndarray,
+            ask_exchanges: np.ndarray,
+            exchanges: List[str]):
+
+        bid_order = np.argsort(-bid_prices, kind='stable')
+        ask_order = np.argsort(ask_prices, kind='stable')
+        self.bid_prices = np.ascontiguousarray(bid_prices[bid_order], dtype=np.float64)
+        self.bid_sizes = np.ascontiguousarray(bid_sizes[bid_order], dtype=np.float64)
+        self.bid_exchanges = np.ascontiguousarray(bid_exchanges[bid_order], dtype=np.int32)
+        self.ask_prices = np.ascontiguousarray(ask_prices[ask_order], dtype=np.float64)
+        self.ask_sizes = np.ascontiguousarray(ask_sizes[ask_order], dtype=np.float64)
+        self.ask_exchanges = np.ascontiguousarray(ask_exchanges[ask_order], dtype=np.int32)
+        self.exchanges = list(exchanges)
+        self._cumulative = {}
+
+    @classmethod
+    def from_response(cls, response: Union[list, dict]) -> 'OrderBook':
+
+        """
+
+        :param response: result of BlockSize.get_orderbook_data, one entry per exchange
+        """
+
+        if isinstance(response, dict):
+            response = [response]
+        exchanges, bids, asks = [], [], []
+        for code, entry in enumerate(response or []):
+            exchanges.append(entry.get('exchange', str(code)).upper())
+            bids.append(np.asarray(entry.get('bids') or np.empty((0, 2)), dtype=np.float64).reshape(-1, 2))
+            asks.append(np.asarray(entry.get('asks') or np.empty((0, 2)), dtype=np.float64).reshape(-1, 2))
+
+        def stack(levels):
+            if not levels:
+                return np.empty((0, 2)), np.empty(0, dtype=np.int32)
+            codes = np.concatenate([np.full(len(side), code, dtype=np.int32) for code, side in enumerate(levels)])
+            return np.concatenate(levels), codes
+
+        bid_levels, bid_codes = stack(bids)
+        ask_levels, ask_codes = stack(asks)
+        return cls(bid_levels[:, 0], bid_levels[:, 1], bid_codes,
+                   ask_levels[:, 0], ask_levels[:, 1], ask_codes, exchanges)
+
+    @classmethod
+    def merge(cls, books: Iterable['OrderBook']) -> 'OrderBook':
+        books = list(books)
+        exchanges = []
+        for book in books:
+            exchanges.extend(name for name in book.exchanges if name not in exchanges)
+
+        def codes(book, side_codes):
+            mapping = np.array([exchanges.index(name) for name in book.exchanges], dtype=np.int32)
+            return mapping[side_codes] if len(mapping) else side_codes
+
+        return cls(np.concatenate([book.bid_prices for book in books]),
+                   np.concatenate([book.bid_sizes for book in books]),
+                   np.concatenate([codes(book, book.bid_exchanges) for book in books]),
+                   np.concatenate([book.ask_prices for book in books]),
+                   np.concatenate([book.ask_sizes for book in books]),
+                   np.concatenate([codes(book, book.ask_exchanges) for book in books]),
+                   exchanges)
+
+    def select(self, exchanges: Union[str, List[str]]) -> 'OrderBook':
+
+        """
+
+        :return: book restricted to the given exchanges
+        """
+
+        if isinstance(exchanges, str):
+            exchanges = exchanges.replace(' ', '').split(',')
+        wanted = np.array([name in {e.upper() for e in exchanges} for name in self.exchanges], dtype=bool)
+        bids = wanted[self.bid_exchanges] if len(wanted) else np.zeros(0, dtype=bool)
+        asks = wanted[self.ask_exchanges] if len(wanted) else np.zeros(0, dtype=bool)
+        return OrderBook(self.bid_prices[bids], self.bid_sizes[bids], self.bid_exchanges[bids],
+                         self.ask_prices[asks], self.ask_sizes[asks], self.ask_exchanges[asks], self.exchanges)
+
+    def side(self, direction: str):
+
+        """
+
+        :param direction: buy fills against the asks, sell against the bids
+        :return: (prices, sizes, exchange codes) of the levels an order in this direction would take
+        """
+
+        if direction.upper() == 'BUY':
+            return self.ask_prices, self.ask_sizes, self.ask_exchanges
+        if direction.upper() == 'SELL':
+            return self.bid_prices, self.bid_sizes, self.bid_exchanges
+        raise ValueError(f'Unknown direction {direction}, expected BUY or SELL')
+
+    def _cumsums(self, direction: str):
+        direction = direction.upper()
+        if direction not in self._cumulative:
+            prices, sizes, _ = self.side(direction)
+            self._cumulative[direction] = (np.concatenate([[0.0], np.cumsum(sizes)]),
+                                           np.concatenate([[0.0], np.cumsum(prices * sizes)]))
+        return self._cumulative[direction]
+
+    @property
+    def best_bid(self) -> float:
+        return self.bid_prices[0] if len(self.bid_prices) else np.nan
+
+    @property
+    def best_ask(self) -> float:
+        return self.ask_prices[0] if len(self.ask_prices) else np.nan
+
+    @property
+    def mid(self) -> float:
+        return (self.best_bid + self.best_ask) / 2
+
+    @property
+    def spread(self) -> float:
+        return self.best_ask - self.best_bid
+
+    @property
+    def spread_bps(self) -> float:
+        return self.spread / self.mid * 1e4
+
+    def notional_to_fill(self, quantity: Union[float, np.ndarray], direction: str) -> np.ndarray:
+
+        """
+
+        :param quantity: base currency amount(s)
+        :param direction: BUY, SELL
+        :return: quote currency amount needed (buy) or received (sell), nan where the book is too thin
+        """
+
+        prices, _, _ = self.side(direction)
+        cumulative_size, cumulative_notional = self._cumsums(direction)
+        quantity = np.asarray(quantity, dtype=np.float64)
+        level = np.clip(np.searchsorted(cumulative_size, quantity, side='left'), 1, max(len(prices), 1))
+        notional = cumulative_notional[level - 1] + (quantity - cumulative_size[level - 1]) * \
+            (prices[level - 1] if len(prices) else 0.0)
+        return np.where(quantity <= cumulative_size[-1], notional, np.nan)
+
+    def vwap_to_fill(self, quantity: Union[float, np.ndarray], direction: str) -> np.ndarray:
+
+        """
+
+        :return: average execution price of a market order of the given size(s), nan where the book is too thin
+        """
+
+        quantity = np.asarray(quantity, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.notional_to_fill(quantity, direction) / quantity
+
+    def slippage_bps(self, quantity: Union[float, np.ndarray], direction: str) -> np.ndarray:
+
+        """
+
+        :return: distance of the average execution price from mid in basis points, positive is a cost
+        """
+
+        sign = 1 if direction.upper() == 'BUY' else -1
+        return sign * (self.vwap_to_fill(quantity, direction) / self.mid - 1) * 1e4
+
+    def depth(self, bps: Union[float, np.ndarray], direction: str) -> np.ndarray:
+
+        """
+
+        :param bps: distance(s) from mid in basis points
+        :param direction: BUY counts asks up to mid * (1 + bps), SELL counts bids down to mid * (1 - bps), levels
+        exactly at that price included
+        :return: base currency quantity available within that distance, nan when one side is empty and there is no mid
+        """
+
+        prices, _, _ = self.side(direction)
+        cumulative_size, _ = self._cumsums(direction)
+        bps = np.asarray(bps, dtype=np.float64)
+        # the relative tolerance keeps a level quoted exactly at the distance from being lost to rounding
+        if direction.upper() == 'BUY':
+            levels = np.searchsorted(prices, self.mid * (1 + bps / 1e4) * (1 + BOUNDARY_TOLERANCE), side='right')
+        else:
+            levels = np.searchsorted(-prices, -self.mid * (1 - bps / 1e4) * (1 - BOUNDARY_TOLERANCE), side='right')
+        return np.where(np.isnan(self.mid), np.nan, cumulative_size[levels])
+
+    def fill_by_exchange(self, quantity: float, direction: str) -> dict:
+
+        """
+
+        :return: {exchange: (quantity, average price)} of the levels a market order of this size would take
+        """
+
+        prices, sizes, codes = self.side(direction)
+        cumulative_size, _ = self._cumsums(direction)
+        taken = np.clip(quantity - cumulative_size[:-1], 0, sizes)
+        fills = {}
+        for code in np.unique(codes[taken > 0]):
+            mask = (codes == code) & (taken > 0)
+            amount = taken[mask].sum()
+            fills[self.exchanges[code]] = (float(amount), float((taken[mask] * prices[mask]).sum() / amount))
+        return fills
+
+    def __len__(self) -> int:
+        return len(self.bid_prices) + len(self.ask_prices)
+
+    def __repr__(self) -> str:
+        return f'OrderBook(exchanges={self.exchanges}, bids={len(self.bid_prices)}, asks={len(self.ask_prices)}, ' \
+               f'bid={self.best_bid}, ask={self.best_ask})'
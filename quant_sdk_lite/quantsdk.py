@@ -1,13 +1,35 @@
-import requests
 import datetime
-import pandas as pd
 from typing import Union, List
 
+from .transport import Transport
+from .cache import ResponseCache
+from .orderbook import OrderBook
+from . import decode
+
 
 class BlockSize:
 
-    def __init__(self, token: str):
+    def __init__(self, token: str, transport: Transport = None, cache: ResponseCache = None):
         self.token = token
+        self.transport = transport if transport is not None else Transport(token)
+        self.cache = cache
+
+    def _cached(self, key: tuple, path: str, interval: str = None):
+        if self.cache is None:
+            return self.transport.get_json(path)
+        ttl = self.cache.ttl(key[0], int(interval[:-1]) if interval is not None else None)
+        return self.cache.get_or_fetch(key, ttl, lambda: self._fetch(path), cacheable=lambda result: result[0])[1]
+
+    def _fetch(self, path: str) -> tuple:
+
+        """
+
+        :return: (whether the response was successful (2xx), decoded body)
+        """
+
+        response = self.transport.get(path)
+        with self.transport.phase(path, 'parse'):
+            return 200 <= response.status_code < 300, decode.loads(response.content)
 
     def get_orderbook_data(self, exchanges: Union[str, List[str]], base: str, quote: str, depth: int = 1) -> dict:
 
@@ -24,29 +46,27 @@ class BlockSize:
             raise ValueError('Either pair or base and quote need to be specified')
 
         pair = base + quote
-        response = requests.get(f"https://api.blocksize.capital/v1/data/orderbook?exchanges={exchanges}"
-                                f"&ticker={pair}&limit={depth}", headers={"x-api-key": self.token})
-        return response.json()
+        return self._cached(('orderbook', exchanges, pair, depth),
+                            f"/data/orderbook?exchanges={exchanges}&ticker={pair}&limit={depth}")
+
+    def get_orderbook(self, exchanges: Union[str, List[str]], base: str, quote: str, depth: int = 1) -> OrderBook:
+        data = self.get_orderbook_data(exchanges, base, quote, depth)
+        with self.transport.phase('/data/orderbook', 'build'):
+            return OrderBook.from_response(data)
 
     def get_vwap(self, base: str, quote: str, interval: str):
 
         if type(interval) == str:
             interval = self.converter(interval)
         pair = base + quote
-        response = requests.get(
-            f"https://api.blocksize.capital/v1/data/vwap/latest/{pair}/{self.converter(self.converter(interval))}",
-            headers={"x-api-key": self.token})
-        return response.json()
+        return self._cached(('vwap', pair, interval), f"/data/vwap/latest/{pair}/{interval}", interval)
 
     def get_ohlc(self, base: str, quote: str, interval: str):
 
         if type(interval) == str:
             interval = self.converter(interval)
         pair = base + quote
-        response = requests.get(
-            f"https://api.blocksize.capital/v1/data/ohlc/latest/{pair}/{self.converter(self.converter(interval))}",
-            headers={"x-api-key": self.token})
-        return response.json()
+        return self._cached(('ohlc', pair, interval), f"/data/ohlc/latest/{pair}/{interval}", interval)
 
     def get_historic_vwap(
             self,
@@ -54,7 +74,8 @@ class BlockSize:
             quote: str,
             interval: str,
             start_date: int,
-            end_date: int):
+            end_date: int,
+            output: str = 'pandas'):
 
         """
 
@@ -63,20 +84,13 @@ class BlockSize:
         :param interval: 1s, 5s, 30s, 1m, 5m, 30m, 60m
         :param start_date: Unix time stamp
         :param end_date: Unix time stamp
+        :param output: pandas (DataFrame), numpy (structured array), arrow (pyarrow.Table) or columns (dict of arrays)
         :return:
         """
 
-        pair = base + quote
-        response = requests.get(f"https://api.blocksize.capital/v1/data/vwap/historic/{pair}/"
-                                f"{self.converter(interval)}?from={start_date}&to={end_date}",
-                                headers={"x-api-key": self.token})
-        df = pd.DataFrame(response.json())
-        if df.empty:
-            return df
-        df.rename(columns={'timestamp': 'Time', 'price': 'Price', 'volume': 'Volume'}, inplace=True)
-        df['Time'] = pd.to_datetime(df['Time'], unit='s')
-        df.set_index('Time', inplace=True)
-        return df
+        records = self.get_historic_records('vwap', base, quote, interval, start_date, end_date)
+        with self.transport.phase('/data/vwap/historic', 'build'):
+            return decode.convert(decode.decode_records('vwap', records), output)
 
     def get_historic_ohlc(
             self,
@@ -84,7 +98,8 @@ class BlockSize:
             quote: str,
             interval: str,
             start_date: int,
-            end_date: int):
+            end_date: int,
+            output: str = 'pandas'):
 
         """
 
@@ -93,24 +108,37 @@ class BlockSize:
         :param interval:
         :param start_date: Unix time stamp
         :param end_date: Unix time stamp
+        :param output: pandas (DataFrame), numpy (structured array), arrow (pyarrow.Table) or columns (dict of arrays)
         :return:
         """
 
+        records = self.get_historic_records('ohlc', base, quote, interval, start_date, end_date)
+        with self.transport.phase('/data/ohlc/historic', 'build'):
+            return decode.convert(decode.decode_records('ohlc', records), output)
+
+    def get_historic_records(
+            self,
+            endpoint: str,
+            base: str,
+            quote: str,
+            interval: str,
+            start_date: int,
+            end_date: int) -> list:
+
+        """
+
+        :param endpoint: vwap, ohlc
+        :param base: ETH, BTC
+        :param quote: EUR, USD
+        :param interval: 1s, 5s, 30s, 1m, 5m, 30m, 60m
+        :param start_date: Unix time stamp
+        :param end_date: Unix time stamp
+        :return: the undecoded list of records returned by the historic endpoint
+        """
+
         pair = base + quote
-        response = requests.get(f"https://api.blocksize.capital/v1/data/ohlc/historic/"
-                                f"{pair}/{self.converter(interval)}?from={start_date}&to={end_date}",
-                                headers={"x-api-key": self.token})
-        df = pd.DataFrame(response.json())
-        if df.empty:
-            return df
-        df.rename(columns={'timestamp': 'Time',
-                           'open': 'Open',
-                           'high': 'High',
-                           'low': 'Low',
-                           'close': 'Close'}, inplace=True)
-        df.set_index('Time', inplace=True)
-
-        return df
+        return self.transport.get_json(f"/data/{endpoint}/historic/"
+                                       f"{pair}/{self.converter(interval)}?from={start_date}&to={end_date}")
 
     def post_simulated_order(
             self,
@@ -142,9 +170,7 @@ class BlockSize:
             'DisableLogging': disable_logging,
         }
 
-        response = requests.post("https://api.blocksize.capital/v1/trading/orders/simulated", data=params,
-                                 headers={"x-api-key": self.token})
-        return response.json()
+        return self.transport.post_json("/trading/orders/simulated", data=params)
 
     def post_market_order(
             self,
@@ -172,25 +198,16 @@ class BlockSize:
             'ExchangeList': exchanges,
         }
 
-        response = requests.post("https://api.blocksize.capital/v1/trading/orders?", data=params,
-                                 headers={"x-api-key": self.token})
-
-        return response.json()
+        return self.transport.post_json("/trading/orders?", data=params)
 
     def order_status(self, order_id: str):
-        response = requests.get(f"https://api.blocksize.capital/v1/trading/orders/id/{order_id}",
-                                headers={"x-api-key": self.token})
-        return response.json()
+        return self.transport.get_json(f"/trading/orders/id/{order_id}")
 
     def order_logs(self, order_id: str):
-        response = requests.get(f'https://api.blocksize.capital/v1/trading/orders/id/{order_id}/logs',
-                                headers={"x-api-key": self.token})
-        return response.json()
+        return self.transport.get_json(f'/trading/orders/id/{order_id}/logs')
 
     def get_exchange_balances(self):
-        response = requests.get('https://api.blocksize.capital/v1/positions/exchanges',
-                                headers={"x-api-key": self.token})
-        return response.json()
+        return self.transport.get_json('/positions/exchanges')
 
     @staticmethod
     def converter(interval_string: str) -> str:
@@ -0,0 +1,182 @@
+import time
+import random
+import asyncio
+import threading
+import email.utils
+from typing import Optional
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+OVERLOAD_STATUSES = {429, 503}
+
+
+class TokenBucket:
+
+    def __init__(self, rate: float, burst: float):
+
+        """
+
+        :param rate: tokens added per second
+        :param burst: maximum number of tokens, i.e. requests that may be sent back to back
+        """
+
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+
+        """
+        Takes one token, going into debt if none is left.
+
+        :return: seconds to wait before the request may be sent
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class AdaptiveConcurrency:
+
+    """
+    Limits requests in flight with additive increase / multiplicative decrease: every success raises the limit by
+    1 / limit, every overload signal halves it.
+    """
+
+    def __init__(self, limit: float, minimum: float = 1, maximum: float = None):
+        self.limit = limit
+        self.minimum = minimum
+        self.maximum = maximum if maximum is not None else limit
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        with self._condition:
+            if self.in_flight < max(int(self.limit), 1):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= max(int(self.limit), 1):
+                self._condition.wait()
+            self.in_flight += 1
+
+    async def acquire_async(self):
+        delay = 0.001
+        while not self.try_acquire():
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.05)
+
+    def release(self, overloaded: bool = False):
+        with self._condition:
+            self.in_flight -= 1
+            if overloaded:
+                self.limit = max(self.minimum, self.limit / 2)
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+class RateLimiter:
+
+    """
+    Client-side budget shared by every request of a Transport or AsyncBlockSize. Requests are grouped by the first
+    path segment into the data, trading and positions categories; each category has its own token bucket and adaptive
+    concurrency limit. Failed requests are retried with jittered exponential backoff, honoring Retry-After.
+    """
+
+    DEFAULT_RATES = {
+        'data': (20, 40),
+        'trading': (5, 10),
+        'positions': (2, 4),
+    }
+
+    def __init__(
+            self,
+            rates: dict = None,
+            max_concurrency: int = 16,
+            retries: int = 4,
+            backoff: float = 0.25,
+            max_backoff: float = 30):
+
+        """
+
+        :param rates: {category: (requests per second, burst)}, merged into DEFAULT_RATES
+        :param max_concurrency: upper bound of requests in flight per category
+        :param retries: attempts after the first one for 429 and 5xx responses
+        :param backoff: base delay in seconds, doubled on every retry and jittered
+        :param max_backoff: upper bound for a single delay, Retry-After included
+        """
+
+        rates = dict(self.DEFAULT_RATES, **(rates or {}))
+        self.buckets = {category: TokenBucket(rate, burst) for category, (rate, burst) in rates.items()}
+        self.concurrency = {category: AdaptiveConcurrency(max_concurrency) for category in rates}
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.throttled = 0
+        self.retried = 0
+
+    @staticmethod
+    def category(path: str) -> str:
+        return path.lstrip('/').split('/', 1)[0].split('?', 1)[0]
+
+    def acquire(self, category: str):
+        delay = self.buckets[category].reserve() if category in self.buckets else 0.0
+        if delay > 0:
+            self.throttled += 1
+            time.sleep(delay)
+        if category in self.concurrency:
+            self.concurrency[category].acquire()
+
+    async def acquire_async(self, category: str):
+        delay = self.buckets[category].reserve() if category in self.buckets else 0.0
+        if delay > 0:
+            self.throttled += 1
+            await asyncio.sleep(delay)
+        if category in self.concurrency:
+            await self.concurrency[category].acquire_async()
+
+    def release(self, category: str, status: Optional[int]):
+        if category in self.concurrency:
+            self.concurrency[category].release(overloaded=status in OVERLOAD_STATUSES)
+
+    def should_retry(self, method: str, status: Optional[int], attempt: int) -> bool:
+
+        """
+        GET requests are retried on connection errors (status None), 429 and 5xx. Other methods, i.e. order
+        submissions, are only retried on 429, which the server sends before acting on the request.
+        """
+
+        if attempt >= self.retries:
+            return False
+        if method.upper() == 'GET':
+            return status is None or status in RETRY_STATUSES
+        return status == 429
+
+    def retry_delay(self, attempt: int, retry_after: str = None) -> float:
+        delay = self.backoff * 2 ** attempt * (0.5 + random.random())
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                try:
+                    delay = max(delay, email.utils.parsedate_to_datetime(retry_after).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        self.retried += 1
+        return min(delay, self.max_backoff)
+
+    def stats(self) -> dict:
+        return {
+            'throttled': self.throttled,
+            'retried': self.retried,
+            'concurrency': {category: limit.limit for category, limit in self.concurrency.items()},
+        }
@@ -0,0 +1,170 @@
+import sys
+import numpy as np
+from typing import Union
+
+from .quantsdk import BlockSize
+from . import decode
+
+
+def seconds(interval: Union[str, int]) -> int:
+    if isinstance(interval, str):
+        return int(BlockSize.converter(interval)[:-1])
+    return int(interval)
+
+
+def as_columns(endpoint: str, data) -> dict:
+
+    """
+    Accepts the DataFrame returned by get_historic_vwap / get_historic_ohlc, a structured array or a dict of columns.
+    """
+
+    if isinstance(data, dict):
+        return data
+    pd = sys.modules.get('pandas')
+    if pd is not None and isinstance(data, pd.DataFrame):
+        columns = {'timestamp': np.asarray(data.index.values.astype('datetime64[s]')).view(np.int64)}
+        columns.update((field, data[decode.column_name(field)].to_numpy(dtype=np.float64))
+                       for field in decode.FIELDS[endpoint])
+        return columns
+    if isinstance(data, np.ndarray) and data.dtype.names:
+        return {field: data[field] for field in data.dtype.names}
+    raise ValueError(f'Cannot resample {type(data).__name__}, expected a DataFrame, structured array or dict')
+
+
+def resample_columns(endpoint: str, columns: dict, interval: Union[str, int]) -> dict:
+
+    """
+    Aggregates bars sorted by timestamp into buckets of `interval` seconds aligned to the Unix epoch, each labeled by
+    its start. OHLC buckets take the first open, highest high, lowest low and last close; VWAP buckets the
+    volume-weighted price and the summed volume (the plain mean price where a bucket has no volume).
+
+    :return: {'timestamp': ..., <fields>: ..., 'bars': number of fine bars per bucket}
+    """
+
+    step = seconds(interval)
+    timestamps = columns['timestamp']
+    if not len(timestamps):
+        result = decode.empty_columns(endpoint)
+        result['bars'] = np.empty(0, dtype=np.int64)
+        return result
+
+    buckets = timestamps // step * step
+    starts = np.concatenate(([0], np.flatnonzero(buckets[1:] != buckets[:-1]) + 1))
+    ends = np.concatenate((starts[1:], [len(buckets)]))
+    result = {'timestamp': buckets[starts]}
+
+    if endpoint == 'ohlc':
+        result['open'] = columns['open'][starts]
+        result['high'] = np.maximum.reduceat(columns['high'], starts)
+        result['low'] = np.minimum.reduceat(columns['low'], starts)
+        result['close'] = columns['close'][ends - 1]
+    elif endpoint == 'vwap':
+        price, volume = columns['price'], columns['volume']
+        volumes = np.add.reduceat(volume, starts)
+        weighted = np.add.reduceat(price * volume, starts)
+        means = np.add.reduceat(price, starts) / (ends - starts)
+        result['price'] = np.divide(weighted, volumes, out=means, where=volumes > 0)
+        result['volume'] = volumes
+    else:
+        raise ValueError(f'Unknown endpoint {endpoint}, expected one of {", ".join(decode.FIELDS)}')
+
+    result['bars'] = ends - starts
+    return result
+
+
+def resample(endpoint: str, data, interval: Union[str, int], output: str = 'pandas'):
+
+    """
+
+    :param endpoint: vwap, ohlc
+    :param data: finer bars as returned by get_historic_vwap / get_historic_ohlc, in any output format
+    :param interval: target interval, e.g. 1m, 5m, 1h or seconds
+    :param output: pandas (DataFrame), numpy (structured array), arrow (pyarrow.Table) or columns (dict of arrays)
+    :return: the coarser bars in the same layout as the historic endpoints
+    """
+
+    columns = decode.sort_unique(as_columns(endpoint, data))
+    result = resample_columns(endpoint, columns, interval)
+    del result['bars']
+    return decode.convert(result, output)
+
+
+class Resampler:
+
+    """
+    Incrementally aggregates a growing series of fine bars into coarser ones. Fine bars of the bucket that is still
+    open are kept until the bucket is complete, which is the case once a bar of a later bucket arrives or, when
+    `source_interval` is known, once the last fine bar of the bucket has arrived.
+    """
+
+    def __init__(self, endpoint: str, interval: Union[str, int], source_interval: Union[str, int] = None):
+
+        """
+
+        :param endpoint: vwap, ohlc
+        :param interval: target interval, e.g. 1m, 5m, 1h or seconds
+        :param source_interval: interval of the fine bars, lets the last bucket close without waiting for the next one
+        """
+
+        if endpoint not in decode.FIELDS:
+            raise ValueError(f'Unknown endpoint {endpoint}, expected one of {", ".join(decode.FIELDS)}')
+        self.endpoint = endpoint
+        self.step = seconds(interval)
+        self.source_step = seconds(source_interval) if source_interval is not None else None
+        if self.source_step is not None and self.step % self.source_step:
+            raise ValueError(f'Interval {interval} is not a multiple of {source_interval}')
+        self.last_timestamp = None
+        self._pending = decode.empty_columns(endpoint)
+        self._parts = []
+
+    def update(self, data, output: str = 'columns'):
+
+        """
+        Adds fine bars, e.g. the latest window of get_historic_vwap. Bars not newer than the last bar seen are ignored.
+
+        :return: the coarse bars completed by this update
+        """
+
+        columns = decode.sort_unique(as_columns(self.endpoint, data))
+        if self.last_timestamp is not None:
+            newer = columns['timestamp'] > self.last_timestamp
+            if not newer.all():
+                columns = {field: values[newer] for field, values in columns.items()}
+        if len(columns['timestamp']):
+            self.last_timestamp = int(columns['timestamp'][-1])
+
+        fields = ('timestamp',) + decode.FIELDS[self.endpoint]
+        combined = decode.concat_columns(self.endpoint, [{field: self._pending[field] for field in fields},
+                                                         {field: columns[field] for field in fields}])
+        timestamps = combined['timestamp']
+        if not len(timestamps):
+            return decode.convert(decode.empty_columns(self.endpoint), output)
+
+        open_bucket = timestamps[-1] // self.step * self.step
+        if self.source_step is not None and timestamps[-1] + self.source_step >= open_bucket + self.step:
+            open_bucket += self.step
+        split = np.searchsorted(timestamps, open_bucket)
+        self._pending = {field: values[split:].copy() for field, values in combined.items()}
+        closed = resample_columns(self.endpoint, {field: values[:split] for field, values in combined.items()},
+                                  self.step)
+        del closed['bars']
+        if len(closed['timestamp']):
+            self._parts.append(closed)
+            if len(self._parts) > 64:
+                self._parts = [decode.concat_columns(self.endpoint, self._parts)]
+        return decode.convert(closed, output)
+
+    def bars(self, output: str = 'pandas', partial: bool = False):
+
+        """
+
+        :param partial: include the bucket that is still open, aggregated from the fine bars seen so far
+        :return: every coarse bar completed so far
+        """
+
+        parts = list(self._parts)
+        if partial and len(self._pending['timestamp']):
+            current = resample_columns(self.endpoint, self._pending, self.step)
+            del current['bars']
+            parts.append(current)
+        return decode.convert(decode.concat_columns(self.endpoint, parts), output)
@@ -0,0 +1,217 @@
+import uuid
+import random
+import numpy as np
+from typing import Union, List, Iterable, TYPE_CHECKING
+
+from .orderbook import OrderBook
+from .quantsdk import BlockSize
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DIRECTIONS = {'SELL': 1, 'BUY': 2}
+
+
+class OrderSimulator:
+
+    """
+    Fills market orders against recorded order book snapshots without contacting the API. Orders are grouped by pair,
+    direction and exchange selection and every group is matched against its book in one vectorized pass.
+
+    Every order is filled against the full snapshot on its own; orders of a batch do not consume each other's
+    liquidity or balances.
+    """
+
+    def __init__(self, fee_bp: float = 10, balances: dict = None, chunk_size: int = 10000):
+
+        """
+
+        :param fee_bp: trading fee in basis points of the executed notional, charged in the quote currency
+        :param balances: {currency: amount} checked for orders without unlimited_funds, no check when omitted
+        :param chunk_size: orders matched at once when the per-exchange breakdown is computed
+        """
+
+        self.fee_bp = fee_bp
+        self.balances = {currency.upper(): amount for currency, amount in (balances or {}).items()}
+        self.chunk_size = chunk_size
+        self.books = {}
+        self._selected = {}
+
+    def add_snapshot(self, base: str, quote: str, book: Union[OrderBook, list]):
+
+        """
+
+        :param book: OrderBook or raw get_orderbook_data response
+        """
+
+        if not isinstance(book, OrderBook):
+            book = OrderBook.from_response(book)
+        pair = (base + quote).upper()
+        self.books[pair] = book
+        self._selected = {key: value for key, value in self._selected.items() if key[0] != pair}
+
+    def record(self, sdk: BlockSize, pairs: Iterable[tuple], exchanges: Union[str, List[str]], depth: int = 100):
+
+        """
+        Takes a snapshot of every (base, quote) pair from the API.
+        """
+
+        for base, quote in pairs:
+            self.add_snapshot(base, quote, sdk.get_orderbook_data(exchanges, base, quote, depth))
+
+    def _book(self, pair: str, exchanges: Union[str, List[str]] = None) -> OrderBook:
+        if pair not in self.books:
+            raise ValueError(f'No order book snapshot for {pair}')
+        if exchanges is None:
+            return self.books[pair]
+        if isinstance(exchanges, list):
+            exchanges = ','.join(exchanges)
+        key = (pair, exchanges.upper().replace(' ', ''))
+        if key not in self._selected:
+            self._selected[key] = self.books[pair].select(key[1])
+        return self._selected[key]
+
+    def simulate_arrays(
+            self,
+            base: str,
+            quote: str,
+            direction: str,
+            quantity: Union[float, np.ndarray],
+            exchanges: Union[str, List[str]] = None) -> dict:
+
+        """
+
+        :return: {'average_execution_price', 'notional', 'trading_fees', 'filled'} arrays, one entry per quantity
+        """
+
+        book = self._book((base + quote).upper(), exchanges)
+        quantity = np.asarray(quantity, dtype=np.float64)
+        notional = book.notional_to_fill(quantity, direction)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price = notional / quantity
+        return {
+            'average_execution_price': price,
+            'notional': notional,
+            'trading_fees': notional * self.fee_bp / 1e4,
+            'filled': ~np.isnan(notional),
+        }
+
+    def _breakdown(self, book: OrderBook, quantity: np.ndarray, direction: str):
+        prices, sizes, codes = book.side(direction)
+        cumulative_size, _ = book._cumsums(direction)
+        one_hot = np.zeros((len(prices), len(book.exchanges)))
+        one_hot[np.arange(len(prices)), codes] = 1
+        amounts, notionals = [], []
+        for start in range(0, len(quantity), self.chunk_size):
+            chunk = quantity[start:start + self.chunk_size, None]
+            taken = np.clip(chunk - cumulative_size[None, :-1], 0, sizes[None, :])
+            amounts.append(taken @ one_hot)
+            notionals.append((taken * prices[None, :]) @ one_hot)
+        if not amounts:
+            return np.empty((0, len(book.exchanges))), np.empty((0, len(book.exchanges)))
+        return np.concatenate(amounts), np.concatenate(notionals)
+
+    def simulate(self, orders: Iterable[dict]) -> List[dict]:
+
+        """
+
+        :param orders: dicts with the arguments of BlockSize.post_simulated_order: base, quote, direction, quantity
+        and optionally exchanges and unlimited_funds
+        :return: one response per order in the shape returned by post_simulated_order
+        """
+
+        orders = list(orders)
+        groups = {}
+        for i, order in enumerate(orders):
+            exchanges = order.get('exchanges')
+            if isinstance(exchanges, list):
+                exchanges = ','.join(exchanges)
+            key = ((order['base'] + order['quote']).upper(), order['direction'].upper(),
+                   exchanges.upper().replace(' ', '') if exchanges else None)
+            groups.setdefault(key, []).append(i)
+
+        results = [None] * len(orders)
+        fee_bp = str(self.fee_bp)
+        for (pair, direction, exchanges), indices in groups.items():
+            book = self._book(pair, exchanges)
+            quantity = np.array([float(orders[i]['quantity']) for i in indices])
+            notional = book.notional_to_fill(quantity, direction)
+            amounts, notionals = self._breakdown(book, quantity, direction)
+
+            filled = amounts > 0
+            for row, i in enumerate(indices):
+                order = orders[i]
+                result = {
+                    'order': {
+                        'order_id': str(uuid.uuid4()),
+                        'base_currency': order['base'].upper(),
+                        'quote_currency': order['quote'].upper(),
+                        'direction': DIRECTIONS[direction],
+                        'type': 1,
+                        'quantity': str(order['quantity']),
+                    },
+                    'elapsed_time_retrieval': 0,
+                    'elapsed_time_calculation': 0,
+                    'average_execution_price': '',
+                    'trading_fees': '',
+                    'trades': None,
+                }
+                results[i] = result
+
+                total = float(notional[row])
+                if np.isnan(total):
+                    result['failed_reason'] = 'FAILED_REASON_INSUFFICIENT_LIQUIDITY'
+                    continue
+                fees = total * self.fee_bp / 1e4
+                if not order.get('unlimited_funds', False) and self.balances:
+                    if direction == 'BUY':
+                        funded = self.balances.get(order['quote'].upper(), 0) >= total + fees
+                    else:
+                        funded = self.balances.get(order['base'].upper(), 0) >= quantity[row]
+                    if not funded:
+                        result['failed_reason'] = 'FAILED_REASON_INSUFFICIENT_FUNDS'
+                        continue
+
+                result['average_execution_price'] = str(total / quantity[row])
+                result['trading_fees'] = str(fees)
+                trades = []
+                for code in np.flatnonzero(filled[row]).tolist():
+                    amount, spent = float(amounts[row, code]), float(notionals[row, code])
+                    trades.append({
+                        'exchange': book.exchanges[code],
+                        'quantity': str(amount),
+                        'average_execution_price': str(spent / amount),
+                        'trading_fees': str(spent * self.fee_bp / 1e4),
+                        'fee_bp': fee_bp,
+                    })
+                result['trades'] = trades
+        return results
+
+    def validate(self, sdk: BlockSize, orders: Iterable[dict], sample: int = 10, seed: int = None) -> 'pd.DataFrame':
+
+        """
+        Sends a random sample of the orders to post_simulated_order and compares the average execution prices. Take a
+        fresh snapshot right before, otherwise the difference mostly measures how far the market moved.
+
+        :return: DataFrame with the local and remote average execution price and their difference in basis points
+        """
+
+        orders = list(orders)
+        picked = random.Random(seed).sample(range(len(orders)), min(sample, len(orders)))
+        local = self.simulate([orders[i] for i in picked])
+        rows = []
+        for i, result in zip(picked, local):
+            order = orders[i]
+            remote = sdk.post_simulated_order(order['base'], order['quote'], order['direction'], order['quantity'],
+                                              order.get('exchanges'), unlimited_funds=True, disable_logging=True)
+            local_price = float(result['average_execution_price'] or 'nan')
+            remote_price = float(remote.get('average_execution_price') or 'nan')
+            rows.append({
+                'order': i,
+                'local': local_price,
+                'remote': remote_price,
+                'diff_bps': (local_price / remote_price - 1) * 1e4,
+            })
+        import pandas as pd
+
+        return pd.DataFrame(rows, columns=['order', 'local', 'remote', 'diff_bps']).set_index('order')
@@ -0,0 +1,294 @@
+import os
+import json
+import time
+import shutil
+import threading
+import numpy as np
+from typing import List, Tuple, TYPE_CHECKING
+
+from .quantsdk import BlockSize
+from .history import HistoricDownloader
+from . import decode
+from .decode import FIELDS
+from .resample import resample
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DAY = 24 * 60 * 60
+
+
+def merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_range(ranges: List[Tuple[int, int]], start: int, end: int) -> List[Tuple[int, int]]:
+    remaining = []
+    for a, b in ranges:
+        if b < start or a > end:
+            remaining.append((a, b))
+            continue
+        if a < start:
+            remaining.append((a, start - 1))
+        if b > end:
+            remaining.append((end + 1, b))
+    return remaining
+
+
+def missing_ranges(ranges: List[Tuple[int, int]], start: int, end: int) -> List[Tuple[int, int]]:
+    gaps = []
+    cursor = start
+    for a, b in ranges:
+        if b < cursor:
+            continue
+        if a > end:
+            break
+        if a > cursor:
+            gaps.append((cursor, a - 1))
+        cursor = max(cursor, b + 1)
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class HistoricStore:
+
+    """
+    Local cache of historic VWAP/OHLC data. Every (endpoint, pair, interval) gets its own directory with one
+    sub-directory per UTC day holding a memory-mappable .npy file per column, plus a coverage.json listing the
+    time ranges that have already been downloaded.
+    """
+
+    def __init__(
+            self,
+            sdk: BlockSize,
+            root: str,
+            max_bytes: int = None,
+            offline: bool = False,
+            downloader: HistoricDownloader = None):
+
+        """
+
+        :param sdk: client used to fill gaps
+        :param root: directory of the store
+        :param max_bytes: least recently read day partitions are removed once the store grows beyond this size; the
+        days of a running get are never removed, so a single request larger than max_bytes is still returned in full
+        :param offline: never contact the API, only serve what is already on disk
+        :param downloader: used to fetch missing ranges, defaults to a HistoricDownloader on sdk
+        """
+
+        self.sdk = sdk
+        self.root = root
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.downloader = downloader if downloader is not None else HistoricDownloader(sdk)
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self._key_locks = {}
+        self._pinned = {}
+        os.makedirs(root, exist_ok=True)
+
+    def _key_lock(self, key_dir: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(os.path.normpath(key_dir), threading.Lock())
+
+    def _key_dir(self, endpoint: str, pair: str, interval: str) -> str:
+        return os.path.join(self.root, endpoint, pair, BlockSize.converter(interval))
+
+    def coverage(self, endpoint: str, pair: str, interval: str) -> List[Tuple[int, int]]:
+        return self._read_coverage(self._key_dir(endpoint, pair, interval))
+
+    def _write_coverage(self, key_dir: str, ranges: List[Tuple[int, int]]):
+        os.makedirs(key_dir, exist_ok=True)
+        tmp = os.path.join(key_dir, 'coverage.json.tmp')
+        with open(tmp, 'w') as fh:
+            json.dump(merge_ranges(ranges), fh)
+        os.replace(tmp, os.path.join(key_dir, 'coverage.json'))
+
+    def get(self, endpoint: str, base: str, quote: str, interval: str, start_date: int, end_date: int,
+            output: str = 'pandas') -> 'pd.DataFrame':
+
+        """
+
+        :param endpoint: vwap, ohlc
+        :param base: ETH, BTC
+        :param quote: EUR, USD
+        :param interval: 1s, 5s, 30s, 1m, 5m, 30m, 60m
+        :param start_date: Unix time stamp
+        :param end_date: Unix time stamp
+        :param output: pandas (DataFrame), numpy (structured array), arrow (pyarrow.Table) or columns (dict of arrays)
+        :return: the same DataFrame as BlockSize.get_historic_vwap / get_historic_ohlc
+        """
+
+        pair = base + quote
+        key_dir = self._key_dir(endpoint, pair, interval)
+        days = [os.path.join(key_dir, str(day)) for day in range(start_date // DAY, end_date // DAY + 1)]
+        self._pin(days, 1)
+        try:
+            if not self.offline:
+                self.fill(endpoint, base, quote, interval, start_date, end_date)
+            columns = self.read(endpoint, pair, interval, start_date, end_date)
+        finally:
+            self._pin(days, -1)
+        self._evict()
+        return decode.convert(columns, output)
+
+    def _pin(self, day_dirs: List[str], count: int):
+        with self._lock:
+            for day_dir in map(os.path.normpath, day_dirs):
+                pinned = self._pinned.get(day_dir, 0) + count
+                if pinned:
+                    self._pinned[day_dir] = pinned
+                else:
+                    del self._pinned[day_dir]
+
+    def get_vwap(self, base: str, quote: str, interval: str, start_date: int, end_date: int,
+                 output: str = 'pandas') -> 'pd.DataFrame':
+        return self.get('vwap', base, quote, interval, start_date, end_date, output)
+
+    def get_ohlc(self, base: str, quote: str, interval: str, start_date: int, end_date: int,
+                 output: str = 'pandas') -> 'pd.DataFrame':
+        return self.get('ohlc', base, quote, interval, start_date, end_date, output)
+
+    def get_resampled(self, endpoint: str, base: str, quote: str, source_interval: str, interval: str,
+                      start_date: int, end_date: int, output: str = 'pandas') -> 'pd.DataFrame':
+
+        """
+        Builds `interval` bars from the stored `source_interval` bars, so only the finest series is ever downloaded.
+        Buckets at the edges of [start_date, end_date] only cover the part of the range inside it.
+
+        :param source_interval: interval of the stored bars, e.g. 1s
+        :param interval: coarser interval, e.g. 5m or 1h
+        """
+
+        columns = self.get(endpoint, base, quote, source_interval, start_date, end_date, output='columns')
+        return resample(endpoint, columns, interval, output)
+
+    def fill(self, endpoint: str, base: str, quote: str, interval: str, start_date: int, end_date: int):
+
+        """
+        Downloads the parts of [start_date, end_date] that are not covered yet. Only the span of the windows that were
+        actually requested is marked as covered. Ranges closer to now than one interval are fetched but not marked as
+        covered, since the server may still add bars there.
+        """
+
+        pair = base + quote
+        key_dir = self._key_dir(endpoint, pair, interval)
+        lock = self._key_lock(key_dir)
+        settled = int(time.time()) - int(BlockSize.converter(interval)[:-1])
+        with lock:
+            gaps = missing_ranges(self._read_coverage(key_dir), start_date, end_date)
+        for gap_start, gap_end in gaps:
+            windows = self.downloader.windows(interval, gap_start, gap_end)
+            if not windows:
+                continue
+            results = self.downloader.download_records(endpoint, base, quote, interval, gap_start, gap_end)
+            columns = decode.concat_columns(endpoint, [decode.decode_records(endpoint, records) for records in results])
+            del results
+            requested_start, requested_end = windows[0][0], min(windows[-1][1], settled)
+            with lock:
+                self._merge(key_dir, endpoint, columns)
+                if requested_start <= requested_end:
+                    self._write_coverage(key_dir, self._read_coverage(key_dir) + [(requested_start, requested_end)])
+        self._evict()
+
+    def _merge(self, key_dir: str, endpoint: str, columns: dict):
+        names = ('timestamp',) + FIELDS[endpoint]
+        days = columns['timestamp'] // DAY
+        for day in np.unique(days):
+            mask = days == day
+            day_dir = os.path.join(key_dir, str(int(day)))
+            new = {name: columns[name][mask] for name in names}
+            if os.path.isdir(day_dir):
+                old = self._load_day(day_dir, names, mmap=False)
+                new = {name: np.concatenate([old[name], new[name]]) for name in names}
+            new = decode.sort_unique(new)
+            os.makedirs(day_dir, exist_ok=True)
+            for name in names:
+                tmp = os.path.join(day_dir, f'{name}.tmp.npy')
+                np.save(tmp, np.ascontiguousarray(new[name]))
+                os.replace(tmp, os.path.join(day_dir, f'{name}.npy'))
+
+    @staticmethod
+    def _load_day(day_dir: str, names: Tuple[str, ...], mmap: bool = True) -> dict:
+        return {name: np.load(os.path.join(day_dir, f'{name}.npy'), mmap_mode='r' if mmap else None)
+                for name in names}
+
+    def read(self, endpoint: str, pair: str, interval: str, start_date: int, end_date: int) -> dict:
+
+        """
+
+        :return: {'timestamp': ..., field: ...} arrays for the stored bars in [start_date, end_date]. When the range
+        lies within a single day the arrays are read-only memory-mapped views of the files on disk.
+        """
+
+        names = ('timestamp',) + FIELDS[endpoint]
+        key_dir = self._key_dir(endpoint, pair, interval)
+        parts = []
+        with self._key_lock(key_dir):
+            for day in range(start_date // DAY, end_date // DAY + 1):
+                day_dir = os.path.join(key_dir, str(day))
+                if not os.path.isdir(day_dir):
+                    continue
+                columns = self._load_day(day_dir, names)
+                lo = np.searchsorted(columns['timestamp'], start_date, side='left')
+                hi = np.searchsorted(columns['timestamp'], end_date, side='right')
+                parts.append({name: column[lo:hi] for name, column in columns.items()})
+                os.utime(day_dir)
+
+        if not parts:
+            return decode.empty_columns(endpoint)
+        if len(parts) == 1:
+            return parts[0]
+        return {name: np.concatenate([part[name] for part in parts]) for name in names}
+
+    def size(self) -> int:
+        total = 0
+        for directory, _, files in os.walk(self.root):
+            total += sum(os.path.getsize(os.path.join(directory, name)) for name in files)
+        return total
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        with self._evict_lock:
+            self._evict_partitions()
+
+    def _evict_partitions(self):
+        total = self.size()
+        if total <= self.max_bytes:
+            return
+
+        partitions = []
+        for directory, subdirs, files in os.walk(self.root):
+            if 'timestamp.npy' in files:
+                size = sum(os.path.getsize(os.path.join(directory, name)) for name in files)
+                partitions.append((os.path.getmtime(directory), directory, size))
+
+        for _, day_dir, size in sorted(partitions):
+            if total <= self.max_bytes:
+                break
+            key_dir, day = os.path.split(day_dir)
+            with self._key_lock(key_dir):
+                with self._lock:
+                    pinned = os.path.normpath(day_dir) in self._pinned
+                if pinned or not os.path.isdir(day_dir):
+                    continue
+                shutil.rmtree(day_dir)
+                ranges = subtract_range(self._read_coverage(key_dir), int(day) * DAY, (int(day) + 1) * DAY - 1)
+                self._write_coverage(key_dir, ranges)
+            total -= size
+
+    @staticmethod
+    def _read_coverage(key_dir: str) -> List[Tuple[int, int]]:
+        try:
+            with open(os.path.join(key_dir, 'coverage.json'), 'r') as fh:
+                return [tuple(r) for r in json.load(fh)]
+        except FileNotFoundError:
+            return []
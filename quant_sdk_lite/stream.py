@@ -0,0 +1,227 @@
+import json
+import time
+import random
+import asyncio
+import numpy as np
+import websockets
+from typing import Callable, Dict, Tuple, Optional
+
+from .quantsdk import BlockSize
+
+FIELDS = {
+    'vwap': ('timestamp', 'price', 'volume'),
+    'ohlc': ('timestamp', 'open', 'high', 'low', 'close'),
+    'orderbook': ('timestamp', 'bid', 'bid_size', 'ask', 'ask_size'),
+}
+
+
+class RingBuffer:
+
+    """
+    Fixed-size buffer of float64 rows. Appending never allocates; once full the oldest rows are overwritten.
+    """
+
+    def __init__(self, capacity: int, fields: Tuple[str, ...]):
+        self.capacity = capacity
+        self.fields = fields
+        self._data = np.full((capacity, len(fields)), np.nan)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def append(self, row):
+        self._data[self._count % self.capacity] = row
+        self._count += 1
+
+    def latest(self, n: int = None) -> np.ndarray:
+
+        """
+
+        :param n: number of rows, defaults to everything in the buffer
+        :return: copy of the newest rows, oldest first, one column per field
+        """
+
+        n = len(self) if n is None else min(n, len(self))
+        end = self._count % self.capacity
+        if n <= end:
+            return self._data[end - n:end].copy()
+        return np.concatenate([self._data[self.capacity - (n - end):], self._data[:end]])
+
+    def column(self, field: str, n: int = None) -> np.ndarray:
+        return self.latest(n)[:, self.fields.index(field)]
+
+    def last(self) -> Optional[dict]:
+        if not self._count:
+            return None
+        return dict(zip(self.fields, self._data[(self._count - 1) % self.capacity].tolist()))
+
+
+class StreamClient:
+
+    """
+    Subscribes to VWAP, OHLC and order book updates over a websocket. Every update is stored in a RingBuffer per
+    (channel, pair), passed to the registered callbacks and handed to every running async iterator. The connection is
+    re-established with exponential backoff and all subscriptions are sent again after a reconnect. Messages that
+    cannot be decoded are skipped and counted in `invalid`, exceptions raised by callbacks are counted in
+    `callback_errors`, any other error while processing a connection is counted in `errors` and handled like a dropped
+    connection.
+
+    Messages sent: {"action": "subscribe", "channel": "vwap", "ticker": "BTCEUR", "interval": "60s"}
+    Messages expected: {"channel": "vwap", "ticker": "BTCEUR", "timestamp": ..., "price": ..., "volume": ...}, order
+    book updates carry "bids" and "asks" lists like get_orderbook_data.
+    """
+
+    def __init__(
+            self,
+            token: str,
+            url: str = "wss://api.blocksize.capital/v1/ws",
+            buffer_size: int = 10000,
+            reconnect_delay: float = 0.5,
+            max_reconnect_delay: float = 30):
+
+        """
+
+        :param token: Blocksize CORE API token, sent as x-api-key when connecting
+        :param url: websocket endpoint, override to point at a local MockStreamServer
+        :param buffer_size: rows kept per (channel, pair)
+        :param reconnect_delay: first delay in seconds after a dropped connection
+        :param max_reconnect_delay: upper bound for the doubling reconnect delay
+        """
+
+        self.token = token
+        self.url = url
+        self.buffer_size = buffer_size
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.subscriptions = {}
+        self.buffers: Dict[Tuple[str, str], RingBuffer] = {}
+        self.callbacks = []
+        self.reconnects = 0
+        self.invalid = 0
+        self.callback_errors = 0
+        self.errors = 0
+        self._queues = []
+        self._websocket = None
+        self._running = False
+
+    def subscribe(self, channel: str, base: str, quote: str, interval: str = None):
+
+        """
+
+        :param channel: vwap, ohlc, orderbook
+        :param base: ETH, BTC
+        :param quote: EUR, USD
+        :param interval: bar interval for vwap and ohlc, 1s, 5s, 30s, 1m, 5m, 30m, 60m
+        """
+
+        if channel not in FIELDS:
+            raise ValueError(f'Unknown channel {channel}, expected one of {", ".join(FIELDS)}')
+        pair = (base + quote).upper()
+        message = {'action': 'subscribe', 'channel': channel, 'ticker': pair}
+        if interval is not None:
+            message['interval'] = BlockSize.converter(interval)
+        self.subscriptions[(channel, pair)] = message
+        self.buffers.setdefault((channel, pair), RingBuffer(self.buffer_size, FIELDS[channel]))
+        if self._websocket is not None:
+            asyncio.ensure_future(self._send(message))
+
+    def on_update(self, callback: Callable[[str, str, dict], None]):
+
+        """
+
+        :param callback: called with (channel, pair, message) for every update
+        """
+
+        self.callbacks.append(callback)
+
+    def buffer(self, channel: str, base: str, quote: str) -> RingBuffer:
+        return self.buffers[(channel, (base + quote).upper())]
+
+    async def _send(self, message: dict):
+        try:
+            await self._websocket.send(json.dumps(message))
+        except websockets.ConnectionClosed:
+            pass
+
+    @staticmethod
+    def _value(value) -> float:
+        return np.nan if value is None else float(value)
+
+    def _row(self, channel: str, message: dict) -> tuple:
+        if channel == 'orderbook':
+            bids, asks = message.get('bids') or [], message.get('asks') or []
+            return (self._value(message.get('timestamp', message['received'])),
+                    self._value(bids[0][0]) if bids else np.nan, self._value(bids[0][1]) if bids else np.nan,
+                    self._value(asks[0][0]) if asks else np.nan, self._value(asks[0][1]) if asks else np.nan)
+        return tuple(self._value(message.get(field)) for field in FIELDS[channel])
+
+    def _handle(self, raw):
+        try:
+            message = json.loads(raw)
+            channel, pair = message.get('channel'), message.get('ticker')
+            key = (channel, pair)
+            if key not in self.buffers:
+                return
+            message['received'] = time.time()
+            row = self._row(channel, message)
+        except (ValueError, TypeError, KeyError, IndexError, AttributeError):
+            self.invalid += 1
+            return
+        self.buffers[key].append(row)
+
+        for callback in self.callbacks:
+            try:
+                callback(channel, pair, message)
+            except Exception:
+                self.callback_errors += 1
+        for queue in self._queues:
+            queue.put_nowait((channel, pair, message))
+
+    async def run(self):
+
+        """
+        Connects and processes updates until stop() is called.
+        """
+
+        self._running = True
+        delay = self.reconnect_delay
+        while self._running:
+            try:
+                async with websockets.connect(self.url, additional_headers={'x-api-key': self.token}) as websocket:
+                    self._websocket = websocket
+                    delay = self.reconnect_delay
+                    for message in list(self.subscriptions.values()):
+                        await websocket.send(json.dumps(message))
+                    async for raw in websocket:
+                        self._handle(raw)
+            except (OSError, asyncio.TimeoutError, websockets.WebSocketException):
+                pass
+            except Exception:
+                self.errors += 1
+            finally:
+                self._websocket = None
+            if not self._running:
+                break
+            self.reconnects += 1
+            await asyncio.sleep(delay * (0.5 + random.random()))
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def stop(self):
+        self._running = False
+        if self._websocket is not None:
+            await self._websocket.close()
+        for queue in self._queues:
+            queue.put_nowait(None)
+
+    async def __aiter__(self):
+        queue = asyncio.Queue()
+        self._queues.append(queue)
+        try:
+            while True:
+                update = await queue.get()
+                if update is None:
+                    return
+                yield update
+        finally:
+            self._queues.remove(queue)
@@ -0,0 +1,281 @@
+import time
+import heapq
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional
+
+from .quantsdk import BlockSize
+
+OPEN, CLOSED, FAILED, PARTIALLY_FILLED = 1, 2, 3, 4
+STATUS_NAMES = {OPEN: 'open', CLOSED: 'closed', FAILED: 'failed', PARTIALLY_FILLED: 'partially_filled'}
+TERMINAL = {CLOSED, FAILED}
+
+
+class OrderEvent:
+
+    def __init__(self, order_id: str, status: int, previous_status: int, response: dict, submitted_at: float,
+                 detected_at: float):
+
+        """
+
+        :param status: aggregated_status of order_status, see STATUS_NAMES
+        :param previous_status: status seen on the poll before, None on the first poll
+        :param response: full order_status response
+        :param submitted_at: time.time() when the order was submitted or started being tracked
+        :param detected_at: time.time() when the poll that saw the new status returned
+        """
+
+        self.order_id = order_id
+        self.status = status
+        self.previous_status = previous_status
+        self.response = response
+        self.submitted_at = submitted_at
+        self.detected_at = detected_at
+
+    @property
+    def terminal(self) -> bool:
+        return self.status in TERMINAL
+
+    @property
+    def latency(self) -> float:
+        return self.detected_at - self.submitted_at
+
+    @property
+    def exchange_closed_at(self) -> float:
+
+        """
+
+        :return: latest closed_timestamp reported by the exchanges in seconds, None while nothing is closed
+        """
+
+        closed = [trade.get('status_report', {}).get('closed_timestamp')
+                  for trade in self.response.get('trade_status') or []]
+        closed = [timestamp for timestamp in closed if timestamp]
+        return max(closed) / 1000 if closed else None
+
+    def __repr__(self) -> str:
+        return f'OrderEvent({self.order_id}, {STATUS_NAMES.get(self.status, self.status)}, ' \
+               f'latency={self.latency:.3f}s)'
+
+
+class _Tracked:
+
+    def __init__(self, order_id: str, submitted_at: float, interval: float):
+        self.order_id = order_id
+        self.submitted_at = submitted_at
+        self.interval = interval
+        self.status = None
+
+
+class OrderTracker:
+
+    """
+    Submits orders in parallel and polls every open order on a shared scheduler. An order whose status did not change
+    is polled less and less often, any change (and partially filled orders) resets it to the fastest interval, and
+    closed or failed orders are dropped. Status changes are delivered to callbacks and to async iterators; exceptions
+    raised by callbacks are counted in `callback_errors` and do not keep the event from the other consumers.
+    """
+
+    def __init__(
+            self,
+            sdk: BlockSize,
+            workers: int = 8,
+            min_interval: float = 0.25,
+            max_interval: float = 10,
+            backoff: float = 1.5):
+
+        """
+
+        :param sdk: client used for submitting and polling, its transport pool should allow `workers` connections
+        :param workers: requests in flight at the same time
+        :param min_interval: seconds between polls right after submission or a status change
+        :param max_interval: upper bound for the growing poll interval
+        :param backoff: factor applied to the poll interval after every poll without change
+        """
+
+        self.sdk = sdk
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.callbacks = []
+        self.errors = 0
+        self.callback_errors = 0
+        self.workers = workers
+        self._pool = None
+        self._orders = {}
+        self._schedule = []
+        self._condition = threading.Condition()
+        self._listeners = []
+        self._thread = None
+        self._running = False
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._condition:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def on_event(self, callback: Callable[[OrderEvent], None]):
+        self.callbacks.append(callback)
+
+    def submit_many(self, orders: Iterable[dict], simulated: bool = False) -> List[dict]:
+
+        """
+
+        :param orders: dicts with the arguments of post_market_order (or post_simulated_order if simulated)
+        :return: responses in order; market orders that were accepted are tracked from now on
+        """
+
+        submit = self.sdk.post_simulated_order if simulated else self.sdk.post_market_order
+        orders = list(orders)
+        submitted_at = time.time()
+        responses = list(self._executor().map(lambda order: submit(**order), orders))
+        if not simulated:
+            for response in responses:
+                order_id = (response.get('order') or {}).get('order_id') if isinstance(response, dict) else None
+                if order_id and not response.get('failed_reason'):
+                    self.track(order_id, submitted_at)
+        return responses
+
+    def track(self, order_id: str, submitted_at: float = None):
+        with self._condition:
+            if order_id in self._orders:
+                return
+            tracked = _Tracked(order_id, submitted_at or time.time(), self.min_interval)
+            self._orders[order_id] = tracked
+            heapq.heappush(self._schedule, (time.monotonic(), order_id))
+            self._condition.notify()
+
+    @property
+    def open_orders(self) -> List[str]:
+        with self._condition:
+            return list(self._orders)
+
+    def start(self):
+
+        """
+        Starts polling; a stopped tracker can be started again and keeps polling the orders that are still open.
+        """
+
+        if self._thread is not None:
+            return
+        self._executor()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='OrderTracker', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._condition:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+        self._publish(None)
+
+    def wait(self, timeout: float = None) -> bool:
+
+        """
+
+        :return: True once every tracked order reached a terminal state, False on timeout
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._orders:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and (not self._schedule or self._schedule[0][0] > time.monotonic()):
+                    self._condition.wait(self._schedule[0][0] - time.monotonic() if self._schedule else None)
+                if not self._running:
+                    return
+                due = []
+                while self._schedule and self._schedule[0][0] <= time.monotonic():
+                    due.append(heapq.heappop(self._schedule)[1])
+            pool = self._executor()
+            for order_id in due:
+                pool.submit(self._poll, order_id)
+
+    def _poll(self, order_id: str):
+        try:
+            response = self.sdk.order_status(order_id)
+            status = response.get('aggregated_status')
+        except Exception:
+            response, status = None, None
+        detected_at = time.time()
+
+        with self._condition:
+            tracked = self._orders.get(order_id)
+            if tracked is None:
+                return
+            event = None
+            if status is None:
+                self.errors += 1
+                tracked.interval = min(tracked.interval * self.backoff, self.max_interval)
+            elif status != tracked.status:
+                event = OrderEvent(order_id, status, tracked.status, response, tracked.submitted_at, detected_at)
+                tracked.status = status
+                tracked.interval = self.min_interval
+            elif status == PARTIALLY_FILLED:
+                tracked.interval = self.min_interval
+            else:
+                tracked.interval = min(tracked.interval * self.backoff, self.max_interval)
+
+            if status in TERMINAL:
+                del self._orders[order_id]
+            else:
+                heapq.heappush(self._schedule, (time.monotonic() + tracked.interval, order_id))
+            self._condition.notify_all()
+
+        if event is not None:
+            for callback in self.callbacks:
+                try:
+                    callback(event)
+                except Exception:
+                    with self._condition:
+                        self.callback_errors += 1
+            self._publish(event)
+
+    def _publish(self, event: Optional[OrderEvent]):
+        for loop, queue in list(self._listeners):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                # the listener's event loop is closed
+                pass
+
+    async def events(self):
+
+        """
+        Async iterator over all status changes until stop() is called.
+        """
+
+        listener = (asyncio.get_running_loop(), asyncio.Queue())
+        self._listeners.append(listener)
+        try:
+            while True:
+                event = await listener[1].get()
+                if event is None:
+                    return
+                yield event
+        finally:
+            self._listeners.remove(listener)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
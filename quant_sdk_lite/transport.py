@@ -0,0 +1,152 @@
+import time
+import requests
+from contextlib import contextmanager
+from requests.adapters import HTTPAdapter
+from typing import Union, Tuple
+
+from .ratelimit import RateLimiter
+from .metrics import Instrumentation, TIMED_POOL_CLASSES, take_connect_time
+from . import decode
+
+
+class Transport:
+
+    def __init__(
+            self,
+            token: str,
+            base_url: str = "https://api.blocksize.capital/v1",
+            pool_connections: int = 4,
+            pool_maxsize: int = 32,
+            pool_block: bool = False,
+            timeout: Union[float, Tuple[float, float]] = (3.05, 30),
+            keep_alive: bool = True,
+            compress: bool = True,
+            limiter: RateLimiter = None,
+            instrumentation: Instrumentation = None):
+
+        """
+
+        :param token: Blocksize CORE API token, sent as x-api-key on every request
+        :param base_url: API root, override to point at a local stand-in server
+        :param pool_connections: number of host pools kept by the session
+        :param pool_maxsize: connections kept alive per host pool
+        :param pool_block: wait for a free connection instead of opening an unpooled one
+        :param timeout: seconds, either a single value or (connect, read)
+        :param keep_alive: reuse connections between requests
+        :param compress: ask the server for gzip/deflate encoded bodies
+        :param limiter: client-side rate limiting and retries, every request is sent once as is when omitted
+        :param instrumentation: records per-endpoint phase latencies, bytes and errors of every request
+        """
+
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.limiter = limiter
+        self.instrumentation = instrumentation
+        self.headers = {
+            "x-api-key": token,
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate" if compress else "identity",
+            "Connection": "keep-alive" if keep_alive else "close",
+        }
+
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        if instrumentation is not None:
+            adapter.poolmanager.pool_classes_by_scheme = TIMED_POOL_CLASSES
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _send(self, method: str, path: str, params: dict = None, data: dict = None) -> requests.Response:
+        if self.instrumentation is None:
+            return self.session.request(method, self.base_url + path, params=params, data=data, timeout=self.timeout)
+
+        self.instrumentation.request_started(method, path)
+        take_connect_time()
+        phases, status, size, error = {}, None, 0, None
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, params=params, data=data,
+                                            timeout=self.timeout, stream=True)
+            headers = time.perf_counter()
+            status = response.status_code
+            phases['wait'] = headers - start
+            response.content
+            phases['download'] = time.perf_counter() - headers
+            size = response.raw.tell() if hasattr(response.raw, 'tell') else len(response.content)
+            return response
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            dns, connect = take_connect_time()
+            if dns or connect:
+                phases['dns'], phases['connect'] = dns, connect
+                if 'wait' in phases:
+                    phases['wait'] -= dns + connect
+            self.instrumentation.request_finished(method, path, status, size, phases, error)
+
+    def request(self, method: str, path: str, params: dict = None, data: dict = None) -> requests.Response:
+        if self.limiter is None:
+            return self._send(method, path, params=params, data=data)
+
+        category = self.limiter.category(path)
+        attempt = 0
+        while True:
+            self.limiter.acquire(category)
+            response, status = None, None
+            try:
+                response = self._send(method, path, params=params, data=data)
+                status = response.status_code
+            except (requests.ConnectionError, requests.Timeout):
+                if not self.limiter.should_retry(method, None, attempt):
+                    raise
+            finally:
+                self.limiter.release(category, status)
+
+            if response is not None and not self.limiter.should_retry(method, status, attempt):
+                return response
+            retry_after = None
+            if response is not None:
+                retry_after = response.headers.get('Retry-After')
+                response.close()
+            time.sleep(self.limiter.retry_delay(attempt, retry_after))
+            attempt += 1
+
+    def get(self, path: str, params: dict = None) -> requests.Response:
+        return self.request('GET', path, params=params)
+
+    def post(self, path: str, data: dict = None) -> requests.Response:
+        return self.request('POST', path, data=data)
+
+    def get_json(self, path: str, params: dict = None):
+        response = self.get(path, params=params)
+        with self.phase(path, 'parse'):
+            return decode.loads(response.content)
+
+    def post_json(self, path: str, data: dict = None):
+        response = self.post(path, data=data)
+        with self.phase(path, 'parse'):
+            return decode.loads(response.content)
+
+    @contextmanager
+    def phase(self, path: str, phase: str):
+
+        """
+        Times the enclosed block as a phase of the endpoint behind path when instrumentation is enabled.
+        """
+
+        if self.instrumentation is None:
+            yield
+        else:
+            with self.instrumentation.phase(path, phase):
+                yield
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
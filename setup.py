@@ -11,6 +11,16 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/Blocksize-Capital-GmbH/QuantSDK.git",
     packages=setuptools.find_packages(),
+    install_requires=['requests', 'numpy', 'pandas'],
+    extras_require={
+        'async': ['aiohttp'],
+        'stream': ['websockets>=13'],
+        'fast': ['orjson'],
+        'arrow': ['pyarrow'],
+    },
+    entry_points={
+        'console_scripts': ['quantsdk-export = quant_sdk_lite.cli:main'],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: GNU General Public License v3 or later (GPLv3+)",
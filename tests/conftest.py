@@ -0,0 +1,18 @@
+import pytest
+
+from quant_sdk_lite.quantsdk import BlockSize
+from quant_sdk_lite.transport import Transport
+from quant_sdk_lite.mockapi import MockAPIServer
+
+
+@pytest.fixture
+def api():
+    with MockAPIServer(seed=1) as server:
+        yield server
+
+
+@pytest.fixture
+def sdk(api):
+    transport = Transport('token', base_url=api.url)
+    yield BlockSize('token', transport=transport)
+    transport.close()
@@ -0,0 +1,38 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+pytest.importorskip('aiohttp')
+pytest.importorskip('pandas')
+
+from quant_sdk_lite.asyncsdk import AsyncBlockSize
+
+PAIRS = [('BTC', 'EUR'), ('ETH', 'EUR')]
+
+
+async def _call(api, method: str, *args):
+    async with AsyncBlockSize('token', base_url=api.url) as sdk:
+        return await getattr(sdk, method)(*args)
+
+
+def test_vwap_many(api):
+    df = asyncio.run(_call(api, 'get_vwap_many', PAIRS, '1m'))
+    assert list(df.index) == ['BTCEUR', 'ETHEUR']
+    assert (df['price'] > 0).all()
+
+
+def test_top_of_book_many(api):
+    df = asyncio.run(_call(api, 'get_top_of_book_many', PAIRS, ['Binance', 'Kraken']))
+    assert len(df) == 4
+    assert (df['bid'] < df['ask']).all()
+
+
+def test_failed_orderbooks_are_reported(api):
+    api.error_rate = 1.0
+    books = asyncio.run(_call(api, 'get_orderbook_many', PAIRS, 'Binance,Kraken'))
+    assert books['BTCEUR'] == [{'exchange': 'BINANCE', 'error': {'error': 'unavailable'}},
+                               {'exchange': 'KRAKEN', 'error': {'error': 'unavailable'}}]
+    df = asyncio.run(_call(api, 'get_top_of_book_many', PAIRS, ['Binance']))
+    assert len(df) == 2
+    assert np.isnan(df['bid']).all() and np.isnan(df['ask']).all()
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from quant_sdk_lite.backtest import run_backtest, run_grid, parameter_grid
+
+pd = pytest.importorskip('pandas')
+
+
+def _frame(rows: int = 2000) -> 'pd.DataFrame':
+    random = np.random.default_rng(1)
+    index = pd.to_datetime(1598918400 + np.arange(rows) * 60, unit='s')
+    return pd.DataFrame({'Close': 100 * np.exp(np.cumsum(random.normal(0, 1e-3, rows)))}, index=index)
+
+
+def momentum(df: 'pd.DataFrame', lookback: int = 10) -> np.ndarray:
+    return np.sign(df['Close'].diff(lookback).fillna(0)).to_numpy()
+
+
+def test_position_is_held_over_the_next_bar():
+    df = pd.DataFrame({'Close': [100.0, 110.0, 99.0, 99.0]})
+    result = run_backtest(df, lambda df: np.array([1, 1, 0, 0]), fee_bp=0, periods_per_year=1)
+    np.testing.assert_allclose(result.frame['return'], [0, 0.1, -0.1, 0])
+    assert result.metrics['total_return'] == pytest.approx(1.1 * 0.9 - 1)
+    assert result.metrics['trades'] == 2
+
+
+def test_fees_are_charged_on_turnover():
+    df = pd.DataFrame({'Close': [100.0] * 4})
+    result = run_backtest(df, lambda df: np.array([1, -1, -1, 0]), fee_bp=10, periods_per_year=1)
+    np.testing.assert_allclose(result.frame['fees'], [1e-3, 2e-3, 0, 1e-3])
+    assert result.metrics['turnover'] == 4
+
+
+def test_periods_per_year_from_index():
+    result = run_backtest(_frame(), momentum)
+    assert result.metrics['sharpe'] == pytest.approx(
+        result.frame['net_return'].mean() / result.frame['net_return'].std() * np.sqrt(365 * 24 * 60))
+
+
+def test_signal_length_is_checked():
+    with pytest.raises(ValueError):
+        run_backtest(_frame(10), lambda df: np.zeros(5))
+
+
+def test_grid_matches_single_runs():
+    df = _frame()
+    grid = run_grid(df, momentum, {'lookback': [5, 20, 60]}, processes=2)
+    assert len(grid) == len(parameter_grid({'lookback': [5, 20, 60]})) == 3
+    for _, row in grid.iterrows():
+        metrics = run_backtest(df, momentum, lookback=int(row['lookback'])).metrics
+        assert row['sharpe'] == pytest.approx(metrics['sharpe'])
+        assert row['trades'] == metrics['trades']
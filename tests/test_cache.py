@@ -0,0 +1,37 @@
+from quant_sdk_lite.cache import ResponseCache
+from quant_sdk_lite.quantsdk import BlockSize
+
+
+def test_responses_are_cached(api, sdk):
+    sdk = BlockSize('token', transport=sdk.transport, cache=ResponseCache())
+    first = sdk.get_vwap('BTC', 'EUR', '60m')
+    requests = api.requests
+    assert sdk.get_vwap('BTC', 'EUR', '60m') == first
+    assert api.requests == requests
+    assert sdk.cache.hits == 1
+
+
+def test_error_responses_are_not_cached(api, sdk):
+    sdk = BlockSize('token', transport=sdk.transport, cache=ResponseCache())
+    api.error_rate = 1.0
+    assert 'error' in sdk.get_vwap('BTC', 'EUR', '60m')
+    api.error_rate = 0.0
+    result = sdk.get_vwap('BTC', 'EUR', '60m')
+    assert result['ticker'] == 'BTCEUR' and 'price' in result
+    assert sdk.cache.misses == 2
+
+
+def test_expired_entries_are_fetched_again():
+    cache = ResponseCache()
+    calls = []
+    assert cache.get_or_fetch('key', 0, lambda: calls.append(1) or len(calls)) == 1
+    assert cache.get_or_fetch('key', 0, lambda: calls.append(1) or len(calls)) == 2
+
+
+def test_bars_expire_at_the_next_bar_boundary():
+    cache = ResponseCache()
+    assert cache.ttl('vwap', 3600, now=7200 + 3500) == 100
+    assert cache.ttl('ohlc', 60, now=120) == 60
+    assert ResponseCache(ttls={'vwap': 30}).ttl('vwap', 3600, now=7200 + 3590) == 10
+    assert ResponseCache(ttls={'vwap': 30}).ttl('vwap', 3600, now=7200) == 30
+    assert cache.ttl('orderbook') == 1.0
@@ -0,0 +1,64 @@
+import glob
+import json
+import os
+
+import numpy as np
+import pytest
+
+from quant_sdk_lite.cli import main, parse_pair, parse_time
+
+START = 1598918400
+
+
+def test_parse_time():
+    assert parse_time('2020-09-01') == START
+    assert parse_time('2020-09-01T00:01:00') == START + 60
+    assert parse_time(str(START)) == START
+
+
+def test_parse_pair():
+    assert parse_pair('btc/eur') == ('BTC', 'EUR')
+    assert parse_pair('ETH-USD') == ('ETH', 'USD')
+
+
+def _export(api, out, *args) -> int:
+    requests = api.requests
+    assert main(['--token', 'token', '--base-url', api.url, '--pairs', 'BTC/EUR', '--intervals', '1m',
+                 '--format', 'csv', '--out', str(out), '--quiet', *args]) == 0
+    return api.requests - requests
+
+
+def _timestamps(out) -> np.ndarray:
+    files = sorted(glob.glob(os.path.join(str(out), '**', '*.csv'), recursive=True))
+    return np.concatenate([np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2)[:, 0] for path in files])
+
+
+def test_rerun_with_other_window_fetches_only_missing(api, tmp_path):
+    assert _export(api, tmp_path, '--start', '2020-09-01', '--end', '2020-09-03', '--window', '1000') == 3
+    assert _export(api, tmp_path, '--start', '2020-09-01', '--end', '2020-09-03', '--window', '333') == 0
+    assert _export(api, tmp_path, '--start', '2020-08-31T12:00:00', '--end', '2020-09-04', '--window', '333') > 0
+    timestamps = _timestamps(tmp_path)
+    assert timestamps[0] == START - 43200 and timestamps[-1] == START + 3 * 86400
+    assert np.all(np.diff(timestamps) == 60)
+    coverage, = glob.glob(os.path.join(str(tmp_path), '**', '_coverage.json'), recursive=True)
+    with open(coverage) as fh:
+        assert json.load(fh) == [[START - 43200, START + 3 * 86400]]
+
+
+def test_failed_export_resumes_without_duplicates(api, tmp_path):
+    api.error_rate = 0.3
+    for window in ('500', '200', '700'):
+        main(['--token', 'token', '--base-url', api.url, '--pairs', 'BTC/EUR', '--intervals', '1m', '--format', 'csv',
+              '--out', str(tmp_path), '--quiet', '--retries', '0', '--start', '2020-09-01', '--end', '2020-09-04',
+              '--window', window])
+    api.error_rate = 0.0
+    _export(api, tmp_path, '--start', '2020-09-01', '--end', '2020-09-04')
+    timestamps = _timestamps(tmp_path)
+    assert len(timestamps) == 3 * 1440 + 1
+    assert np.all(np.diff(timestamps) == 60)
+
+
+def test_parquet_export(api, tmp_path):
+    pytest.importorskip('pyarrow')
+    _export(api, tmp_path, '--start', '2020-09-01', '--end', '2020-09-02', '--format', 'parquet')
+    assert glob.glob(os.path.join(str(tmp_path), '**', '*.parquet'), recursive=True)
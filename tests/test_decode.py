@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from quant_sdk_lite import decode
+
+START = 1598918400
+
+
+def test_loads_accepts_bytes_and_text():
+    assert decode.loads(b'{"price": 1.5}') == {'price': 1.5}
+    assert decode.loads('[1, 2]') == [1, 2]
+
+
+def test_decode_records_types():
+    columns = decode.decode_records('vwap', [{'timestamp': START, 'price': '1.5', 'volume': 2, 'ticker': 'BTCEUR'}])
+    assert columns['timestamp'].dtype == np.int64 and columns['price'].dtype == np.float64
+    assert columns['price'].tolist() == [1.5] and columns['volume'].tolist() == [2.0]
+    assert columns['ticker'].tolist() == ['BTCEUR']
+
+
+@pytest.mark.parametrize('body', [None, [], {}, ''])
+def test_decode_records_empty_bodies(body):
+    columns = decode.decode_records('ohlc', body)
+    assert list(columns) == ['timestamp', 'open', 'high', 'low', 'close']
+    assert all(len(values) == 0 for values in columns.values())
+    assert columns['timestamp'].dtype == np.int64
+
+
+def test_decode_records_rejects_error_bodies():
+    with pytest.raises(ValueError):
+        decode.decode_records('vwap', {'error': 'unavailable'})
+
+
+def test_sort_unique_keeps_the_last_duplicate():
+    columns = {'timestamp': np.array([3, 1, 2, 1, 3]), 'price': np.array([30., 10., 20., 11., 31.])}
+    result = decode.sort_unique(columns)
+    assert result['timestamp'].tolist() == [1, 2, 3]
+    assert result['price'].tolist() == [11., 20., 31.]
+
+
+def test_sort_unique_returns_sorted_input_unchanged():
+    columns = {'timestamp': np.array([1, 2, 3]), 'price': np.array([1., 2., 3.])}
+    assert decode.sort_unique(columns) is columns
+    empty = decode.empty_columns('vwap')
+    assert decode.sort_unique(empty) is empty
+
+
+def test_concat_columns_skips_empty_parts():
+    first = decode.decode_records('vwap', [{'timestamp': START, 'price': 1, 'volume': 1}])
+    second = decode.decode_records('vwap', [{'timestamp': START + 60, 'price': 2, 'volume': 1}])
+    result = decode.concat_columns('vwap', [decode.empty_columns('vwap'), first, second])
+    assert result['timestamp'].tolist() == [START, START + 60]
+    assert decode.concat_columns('vwap', [])['price'].dtype == np.float64
+
+
+def test_outputs():
+    pd = pytest.importorskip('pandas')
+    columns = decode.decode_records('vwap', [{'timestamp': START, 'price': 1.5, 'volume': 2}])
+    df = decode.convert(columns, 'pandas')
+    assert list(df.columns) == ['Price', 'Volume'] and df.index.name == 'Time'
+    assert df.index[0] == pd.Timestamp(START, unit='s')
+    assert decode.convert(columns, 'numpy')['price'][0] == 1.5
+    assert decode.convert(columns, 'columns') is columns
+    with pytest.raises(ValueError):
+        decode.convert(columns, 'excel')
+
+
+def test_historic_error_response_raises(api, sdk):
+    api.error_rate = 1.0
+    with pytest.raises(ValueError):
+        sdk.get_historic_vwap('BTC', 'EUR', '1m', START, START + 3600)
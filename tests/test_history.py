@@ -0,0 +1,52 @@
+import pytest
+
+from quant_sdk_lite.history import HistoricDownloader, DownloadCheckpoint
+
+START = 1598918400
+
+
+@pytest.fixture
+def downloader(sdk):
+    return HistoricDownloader(sdk, max_points=100, workers=4, retries=0)
+
+
+def test_windows_cover_range_with_shared_boundaries(downloader):
+    windows = downloader.windows('1m', START, START + 250 * 60)
+    assert windows == [(START, START + 6000), (START + 6000, START + 12000), (START + 12000, START + 15000)]
+
+
+def test_windows_single_point(downloader):
+    assert downloader.windows('1m', START, START) == [(START, START)]
+
+
+def test_windows_empty_when_end_before_start(downloader):
+    assert downloader.windows('1m', START, START - 1) == []
+
+
+def test_download_includes_both_ends(downloader):
+    columns = downloader.download_vwap('BTC', 'EUR', '1m', START, START + 250 * 60, output='columns')
+    assert len(columns['timestamp']) == 251
+    assert columns['timestamp'][0] == START and columns['timestamp'][-1] == START + 250 * 60
+
+
+def test_download_single_point(downloader):
+    columns = downloader.download_vwap('BTC', 'EUR', '1m', START, START, output='columns')
+    assert columns['timestamp'].tolist() == [START]
+
+
+def test_checkpoint_resumes_without_requests(api, downloader, tmp_path):
+    checkpoint = DownloadCheckpoint(str(tmp_path))
+    first = downloader.download_vwap('BTC', 'EUR', '1m', START, START + 500 * 60, checkpoint, output='columns')
+    requests = api.requests
+    second = downloader.download_vwap('BTC', 'EUR', '1m', START, START + 500 * 60, checkpoint, output='columns')
+    assert api.requests == requests
+    assert (first['price'] == second['price']).all()
+
+
+def test_checkpoint_rejects_other_series(downloader, tmp_path):
+    checkpoint = DownloadCheckpoint(str(tmp_path))
+    downloader.download_vwap('BTC', 'EUR', '1m', START, START + 60, checkpoint, output='columns')
+    with pytest.raises(ValueError):
+        downloader.download_vwap('ETH', 'EUR', '1m', START, START + 60, checkpoint, output='columns')
+    with pytest.raises(ValueError):
+        downloader.download_vwap('BTC', 'EUR', '5m', START, START + 60, checkpoint, output='columns')
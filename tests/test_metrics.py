@@ -0,0 +1,66 @@
+import pytest
+import requests
+
+from quant_sdk_lite.metrics import Instrumentation, Histogram, endpoint_name
+from quant_sdk_lite.quantsdk import BlockSize
+from quant_sdk_lite.transport import Transport
+
+
+def test_endpoint_name():
+    assert endpoint_name('/data/vwap/historic/BTCEUR/60s?from=1&to=2') == 'data/vwap/historic'
+    assert endpoint_name('/data/orderbook?exchanges=None&ticker=BTCEUR&limit=1') == 'data/orderbook'
+    assert endpoint_name('/trading/orders/id/123/logs') == 'trading/orders/id/logs'
+    assert endpoint_name('/trading/orders/id/123') == 'trading/orders/id'
+
+
+def test_histogram():
+    histogram = Histogram((0.1, 1))
+    for value in (0.05, 0.5, 0.5, 5):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1]
+    assert histogram.quantile(0.5) == 1
+    assert histogram.quantile(1) == float('inf')
+    assert histogram.to_dict()['buckets'] == {'0.1': 1, '1': 3, 'inf': 4}
+
+
+@pytest.fixture
+def instrumented(api):
+    metrics = Instrumentation()
+    transport = Transport('token', base_url=f'http://localhost:{api.port}/v1', instrumentation=metrics)
+    yield BlockSize('token', transport=transport), metrics
+    transport.close()
+
+
+def test_phases_per_request(instrumented):
+    sdk, metrics = instrumented
+    samples = []
+    metrics.add_after(samples.append)
+    for _ in range(3):
+        sdk.get_vwap('BTC', 'EUR', '1m')
+    sdk.get_historic_vwap('BTC', 'EUR', '1m', 1598918400, 1598922000)
+    assert set(samples[0]['phases']) == {'dns', 'connect', 'wait', 'download'}
+    assert all(set(sample['phases']) == {'wait', 'download'} for sample in samples[1:])
+    phases = metrics.to_dict()['data/vwap/latest']['phases']
+    assert phases['dns']['count'] == phases['connect']['count'] == 1
+    assert phases['wait']['count'] == phases['parse']['count'] == 3
+    assert metrics.to_dict()['data/vwap/historic']['phases']['build']['count'] == 1
+
+
+def test_errors_and_prometheus(api, instrumented):
+    sdk, metrics = instrumented
+    api.error_rate = 1.0
+    sdk.get_vwap('BTC', 'EUR', '1m')
+    assert metrics.to_dict()['data/vwap/latest']['errors'] == {'http_503': 1}
+    text = metrics.to_prometheus()
+    assert 'quantsdk_errors_total{endpoint="data/vwap/latest",kind="http_503"} 1' in text
+    assert 'quantsdk_request_phase_seconds_count{endpoint="data/vwap/latest",phase="dns"} 1' in text
+
+
+def test_failed_name_resolution_is_recorded():
+    metrics = Instrumentation()
+    with Transport('token', base_url='http://no-such-host.invalid/v1', instrumentation=metrics) as transport:
+        with pytest.raises(requests.ConnectionError):
+            transport.get('/data/vwap/latest/BTCEUR/60s')
+    endpoint = metrics.to_dict()['data/vwap/latest']
+    assert endpoint['errors'] == {'ConnectionError': 1}
+    assert endpoint['phases']['dns']['count'] == 1
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from quant_sdk_lite.orderbook import OrderBook
+
+
+@pytest.fixture
+def book() -> OrderBook:
+    return OrderBook.from_response([
+        {'exchange': 'binance', 'bids': [['99', '1'], ['98', '2']], 'asks': [['101', '1'], ['102', '2']]},
+        {'exchange': 'kraken', 'bids': [['97', '3']], 'asks': [['103', '3']]},
+    ])
+
+
+def _walk(levels: list, quantity: float) -> float:
+    notional = 0.0
+    for price, size in levels:
+        taken = min(size, quantity)
+        notional += taken * price
+        quantity -= taken
+    return notional if quantity <= 1e-9 else np.nan
+
+
+def test_levels_are_consolidated(book):
+    assert book.best_bid == 99 and book.best_ask == 101
+    assert book.mid == 100 and book.spread_bps == 200
+    assert book.ask_prices.tolist() == [101, 102, 103]
+    assert [book.exchanges[code] for code in book.bid_exchanges] == ['BINANCE', 'BINANCE', 'KRAKEN']
+
+
+def test_notional_at_level_boundaries(book):
+    quantities = [0, 0.5, 1, 3, 6]
+    np.testing.assert_allclose(book.notional_to_fill(quantities, 'BUY'), [0, 50.5, 101, 305, 614])
+    np.testing.assert_allclose(book.notional_to_fill(quantities, 'SELL'), [0, 49.5, 99, 295, 586])
+    assert np.isnan(book.notional_to_fill(6.0001, 'BUY'))
+    assert book.vwap_to_fill(3, 'BUY') == pytest.approx(305 / 3)
+
+
+def test_notional_matches_walking_the_book():
+    random = np.random.default_rng(1)
+    prices = 100 + np.cumsum(random.exponential(size=50))
+    sizes = random.exponential(size=50)
+    book = OrderBook(99 - prices, sizes, np.zeros(50, dtype=int), prices, sizes, np.zeros(50, dtype=int), ['A'])
+    quantities = np.concatenate([np.cumsum(sizes), random.uniform(0, sizes.sum() * 1.1, size=200)])
+    expected = [_walk(list(zip(prices, sizes)), quantity) for quantity in quantities]
+    np.testing.assert_allclose(book.notional_to_fill(quantities, 'BUY'), expected)
+
+
+def test_depth_includes_levels_at_the_distance(book):
+    assert book.depth([0, 99, 100, 200, 300], 'BUY').tolist() == [0, 0, 1, 3, 6]
+    assert book.depth([0, 100, 200, 300], 'SELL').tolist() == [0, 1, 3, 6]
+    mid = 25000.5
+    for k in range(1, 200):
+        price = float(repr(round(mid * (1 + k / 1e4), 6)))
+        level = OrderBook(np.array([mid * 2 - price]), np.ones(1), np.zeros(1, dtype=int),
+                          np.array([price]), np.ones(1), np.zeros(1, dtype=int), ['A'])
+        assert level.depth(k, 'BUY') == 1
+
+
+def test_thin_book():
+    book = OrderBook.from_response({'exchange': 'binance', 'bids': [], 'asks': [['101', '1']]})
+    assert book.notional_to_fill(1, 'BUY') == 101
+    assert np.isnan(book.notional_to_fill(1.5, 'BUY'))
+    assert np.isnan(book.notional_to_fill(1, 'SELL'))
+    assert np.isnan(book.depth(100, 'BUY'))
+    empty = OrderBook.from_response([])
+    assert empty.notional_to_fill(0, 'BUY') == 0
+    assert np.isnan(empty.notional_to_fill(1, 'BUY'))
+    assert empty.fill_by_exchange(1, 'BUY') == {}
+
+
+def test_fill_by_exchange(book):
+    fills = book.fill_by_exchange(4, 'BUY')
+    assert fills['BINANCE'] == (3.0, pytest.approx(305 / 3))
+    assert fills['KRAKEN'] == (1.0, 103.0)
+    assert sum(amount * price for amount, price in fills.values()) == pytest.approx(book.notional_to_fill(4, 'BUY'))
+
+
+def test_select_and_merge(book):
+    kraken = book.select('Kraken')
+    assert kraken.best_bid == 97 and kraken.best_ask == 103
+    merged = OrderBook.merge([book.select('binance'), kraken])
+    assert merged.ask_prices.tolist() == book.ask_prices.tolist()
+    assert merged.exchanges == ['BINANCE', 'KRAKEN']
@@ -0,0 +1,78 @@
+import time
+import email.utils
+
+import pytest
+
+from quant_sdk_lite.quantsdk import BlockSize
+from quant_sdk_lite.ratelimit import RateLimiter, TokenBucket, AdaptiveConcurrency
+from quant_sdk_lite.transport import Transport
+
+
+def test_get_is_retried_on_connection_errors_429_and_5xx():
+    limiter = RateLimiter(retries=2)
+    for status in (None, 429, 500, 502, 503, 504):
+        assert limiter.should_retry('GET', status, 0)
+    for status in (200, 400, 401, 404):
+        assert not limiter.should_retry('GET', status, 0)
+    assert not limiter.should_retry('GET', 503, 2)
+
+
+def test_post_is_only_retried_on_429():
+    limiter = RateLimiter(retries=2)
+    assert limiter.should_retry('POST', 429, 0)
+    for status in (None, 500, 502, 503, 504):
+        assert not limiter.should_retry('POST', status, 0)
+    assert not limiter.should_retry('POST', 429, 2)
+
+
+def test_retry_delay_backs_off_with_jitter():
+    limiter = RateLimiter(backoff=1, max_backoff=100)
+    for attempt in range(4):
+        assert 0.5 * 2 ** attempt <= limiter.retry_delay(attempt) <= 1.5 * 2 ** attempt
+    assert limiter.retried == 4
+
+
+def test_retry_after_is_honored_and_capped():
+    limiter = RateLimiter(backoff=0.01, max_backoff=30)
+    assert limiter.retry_delay(0, '7') == 7
+    assert limiter.retry_delay(0, '120') == 30
+    date = email.utils.formatdate(time.time() + 10, usegmt=True)
+    assert 8 <= limiter.retry_delay(0, date) <= 10
+    assert limiter.retry_delay(0, 'soon') <= 0.015
+
+
+def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=10, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_adaptive_concurrency_halves_on_overload():
+    limit = AdaptiveConcurrency(8, minimum=1)
+    assert all(limit.try_acquire() for _ in range(8))
+    assert not limit.try_acquire()
+    limit.release(overloaded=True)
+    assert limit.limit == 4
+    limit.release()
+    assert limit.limit == 4.25
+
+
+def test_transport_retries_failed_gets(api):
+    api.error_rate = 0.5
+    limiter = RateLimiter(retries=10, backoff=0.001)
+    with Transport('token', base_url=api.url, limiter=limiter) as transport:
+        sdk = BlockSize('token', transport=transport)
+        for _ in range(10):
+            assert sdk.get_vwap('BTC', 'EUR', '1m')['ticker'] == 'BTCEUR'
+    assert limiter.retried > 0
+    assert api.requests == 10 + limiter.retried
+
+
+def test_transport_does_not_retry_failed_orders(api):
+    api.error_rate = 1.0
+    limiter = RateLimiter(retries=3, backoff=0.001)
+    with Transport('token', base_url=api.url, limiter=limiter) as transport:
+        response = BlockSize('token', transport=transport).post_market_order('BTC', 'EUR', 'buy', 0.01, 'Kraken')
+    assert response == {'error': 'unavailable'}
+    assert api.requests == 1
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from quant_sdk_lite.resample import resample, Resampler
+
+pd = pytest.importorskip('pandas')
+
+START = 1598918400
+
+
+def _frame(endpoint: str, rows: int = 10000, step: int = 60) -> 'pd.DataFrame':
+    random = np.random.default_rng(1)
+    index = pd.to_datetime(START + np.arange(rows) * step, unit='s')
+    price = 100 + np.cumsum(random.normal(size=rows))
+    if endpoint == 'vwap':
+        volume = random.exponential(size=rows)
+        volume[::7] = 0
+        volume[:60] = 0
+        return pd.DataFrame({'Price': price, 'Volume': volume}, index=index.rename('Time'))
+    spread = random.exponential(size=rows)
+    return pd.DataFrame({'Open': price, 'High': price + spread, 'Low': price - spread,
+                         'Close': price + random.normal(size=rows) * 0.1}, index=index.rename('Time'))
+
+
+def test_ohlc_matches_pandas():
+    df = _frame('ohlc')
+    result = resample('ohlc', df, '5m')
+    expected = df.resample('5min').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'})
+    pd.testing.assert_frame_equal(result, expected, check_freq=False, check_names=False)
+
+
+def test_vwap_matches_pandas():
+    df = _frame('vwap')
+    result = resample('vwap', df, '60m')
+    grouped = df.assign(Notional=df['Price'] * df['Volume']).resample('60min')
+    volume = grouped['Volume'].sum()
+    price = (grouped['Notional'].sum() / volume).where(volume > 0, grouped['Price'].mean())
+    np.testing.assert_allclose(result['Price'].to_numpy(), price.to_numpy())
+    np.testing.assert_allclose(result['Volume'].to_numpy(), volume.to_numpy())
+    assert (result.index == volume.index).all()
+
+
+def test_incremental_resampler_matches_batch():
+    df = _frame('ohlc', rows=3000)
+    resampler = Resampler('ohlc', '30m', source_interval='1m')
+    for first in range(0, len(df), 77):
+        resampler.update(df.iloc[first:first + 77])
+    pd.testing.assert_frame_equal(resampler.bars(), resample('ohlc', df, '30m'))
+
+
+def test_unknown_endpoint_is_rejected():
+    with pytest.raises(ValueError):
+        Resampler('orderbook', '5m')
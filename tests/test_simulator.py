@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from quant_sdk_lite.orderbook import OrderBook
+from quant_sdk_lite.simulator import OrderSimulator
+
+
+def _book(seed: int = 1) -> OrderBook:
+    random = np.random.default_rng(seed)
+    asks = 100 + np.cumsum(random.exponential(0.1, size=60))
+    bids = 100 - np.cumsum(random.exponential(0.1, size=60))
+    return OrderBook(bids, random.exponential(size=60), random.integers(0, 3, 60),
+                     asks, random.exponential(size=60), random.integers(0, 3, 60), ['BINANCE', 'KRAKEN', 'BITSTAMP'])
+
+
+@pytest.fixture
+def simulator() -> OrderSimulator:
+    simulator = OrderSimulator(fee_bp=10, chunk_size=7)
+    simulator.add_snapshot('BTC', 'EUR', _book())
+    return simulator
+
+
+def test_trades_match_fill_by_exchange(simulator):
+    book = simulator.books['BTCEUR']
+    random = np.random.default_rng(2)
+    orders = [{'base': 'BTC', 'quote': 'EUR', 'direction': direction, 'quantity': quantity}
+              for direction in ('BUY', 'SELL') for quantity in random.uniform(0.01, 50, size=20)]
+    for order, result in zip(orders, simulator.simulate(orders)):
+        expected = book.fill_by_exchange(order['quantity'], order['direction'])
+        trades = {trade['exchange']: (float(trade['quantity']), float(trade['average_execution_price']))
+                  for trade in result['trades']}
+        assert trades.keys() == expected.keys()
+        for exchange, (amount, price) in expected.items():
+            assert trades[exchange] == (pytest.approx(amount), pytest.approx(price))
+        notional = book.notional_to_fill(order['quantity'], order['direction'])
+        assert float(result['average_execution_price']) == pytest.approx(notional / order['quantity'])
+        assert float(result['trading_fees']) == pytest.approx(notional * 1e-3)
+        assert sum(float(trade['trading_fees']) for trade in result['trades']) == pytest.approx(notional * 1e-3)
+
+
+def test_exchange_selection(simulator):
+    result, = simulator.simulate([{'base': 'BTC', 'quote': 'EUR', 'direction': 'BUY', 'quantity': 5,
+                                   'exchanges': ['Kraken']}])
+    assert [trade['exchange'] for trade in result['trades']] == ['KRAKEN']
+    expected = simulator.books['BTCEUR'].select('KRAKEN').vwap_to_fill(5, 'BUY')
+    assert float(result['average_execution_price']) == pytest.approx(expected)
+
+
+def test_failed_orders(simulator):
+    simulator.balances = {'EUR': 1000, 'BTC': 1}
+    results = simulator.simulate([
+        {'base': 'BTC', 'quote': 'EUR', 'direction': 'BUY', 'quantity': 1e6},
+        {'base': 'BTC', 'quote': 'EUR', 'direction': 'BUY', 'quantity': 20},
+        {'base': 'BTC', 'quote': 'EUR', 'direction': 'SELL', 'quantity': 2},
+        {'base': 'BTC', 'quote': 'EUR', 'direction': 'SELL', 'quantity': 2, 'unlimited_funds': True},
+    ])
+    assert results[0]['failed_reason'] == 'FAILED_REASON_INSUFFICIENT_LIQUIDITY'
+    assert results[1]['failed_reason'] == 'FAILED_REASON_INSUFFICIENT_FUNDS'
+    assert results[2]['failed_reason'] == 'FAILED_REASON_INSUFFICIENT_FUNDS'
+    assert 'failed_reason' not in results[3] and results[3]['trades']
+
+
+def test_simulate_arrays_matches_simulate(simulator):
+    quantities = np.linspace(0.1, 30, 25)
+    arrays = simulator.simulate_arrays('BTC', 'EUR', 'SELL', quantities)
+    results = simulator.simulate([{'base': 'BTC', 'quote': 'EUR', 'direction': 'SELL', 'quantity': quantity}
+                                  for quantity in quantities])
+    np.testing.assert_allclose(arrays['average_execution_price'],
+                               [float(result['average_execution_price']) for result in results])
+    assert arrays['filled'].all()
+
+
+def test_missing_snapshot(simulator):
+    with pytest.raises(ValueError):
+        simulator.simulate([{'base': 'ETH', 'quote': 'EUR', 'direction': 'BUY', 'quantity': 1}])
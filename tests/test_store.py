@@ -0,0 +1,57 @@
+import numpy as np
+
+from quant_sdk_lite.store import HistoricStore, merge_ranges, missing_ranges
+
+START = 1598918400
+
+
+def test_merge_ranges_joins_adjacent():
+    assert merge_ranges([(10, 20), (0, 9), (30, 40), (35, 50)]) == [(0, 20), (30, 50)]
+
+
+def test_missing_ranges():
+    assert missing_ranges([(0, 9), (20, 29)], 5, 40) == [(10, 19), (30, 40)]
+    assert missing_ranges([(0, 9)], 0, 9) == []
+
+
+def test_second_get_is_served_from_disk(api, sdk, tmp_path):
+    store = HistoricStore(sdk, str(tmp_path))
+    first = store.get_vwap('BTC', 'EUR', '1m', START, START + 3 * 86400, output='columns')
+    requests = api.requests
+    second = store.get_vwap('BTC', 'EUR', '1m', START + 3600, START + 86400, output='columns')
+    assert api.requests == requests
+    mask = (first['timestamp'] >= START + 3600) & (first['timestamp'] <= START + 86400)
+    assert (second['timestamp'] == first['timestamp'][mask]).all()
+    assert store.coverage('vwap', 'BTCEUR', '1m') == [(START, START + 3 * 86400)]
+
+
+def test_one_second_gap_is_fetched(api, sdk, tmp_path):
+    store = HistoricStore(sdk, str(tmp_path))
+    store.get_vwap('BTC', 'EUR', '1s', START, START + 100, output='columns')
+    columns = store.get_vwap('BTC', 'EUR', '1s', START - 1, START + 100, output='columns')
+    assert columns['timestamp'][0] == START - 1
+    assert len(columns['timestamp']) == 102
+    assert np.all(np.diff(columns['timestamp']) == 1)
+    assert store.coverage('vwap', 'BTCEUR', '1s') == [(START - 1, START + 100)]
+
+
+def test_offline_store_does_not_fetch(api, sdk, tmp_path):
+    store = HistoricStore(sdk, str(tmp_path), offline=True)
+    columns = store.get_vwap('BTC', 'EUR', '1m', START, START + 3600, output='columns')
+    assert api.requests == 0
+    assert len(columns['timestamp']) == 0
+
+
+def test_eviction_keeps_the_requested_days(api, sdk, tmp_path):
+    store = HistoricStore(sdk, str(tmp_path), max_bytes=100000)
+    columns = store.get_vwap('BTC', 'EUR', '1m', START, START + 5 * 86400, output='columns')
+    assert len(columns['timestamp']) == 5 * 1440 + 1
+    assert store.size() <= 100000
+
+
+def test_request_larger_than_the_store_is_returned_in_full(api, sdk, tmp_path):
+    store = HistoricStore(sdk, str(tmp_path), max_bytes=1)
+    columns = store.get_vwap('BTC', 'EUR', '1m', START, START + 5 * 86400, output='columns')
+    assert len(columns['timestamp']) == 5 * 1440 + 1
+    assert np.all(np.diff(columns['timestamp']) == 60)
+    assert store.coverage('vwap', 'BTCEUR', '1m') == []
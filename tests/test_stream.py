@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('websockets')
+
+from quant_sdk_lite.mockws import MockStreamServer
+from quant_sdk_lite.stream import StreamClient, RingBuffer
+
+
+def test_ring_buffer_keeps_newest_rows():
+    buffer = RingBuffer(3, ('timestamp', 'price'))
+    for i in range(5):
+        buffer.append((i, i * 10))
+    assert buffer.column('timestamp').tolist() == [2, 3, 4]
+    assert buffer.last() == {'timestamp': 4.0, 'price': 40.0}
+
+
+async def _stream(server: MockStreamServer, seconds: float, callback=None) -> StreamClient:
+    async with server:
+        client = StreamClient('token', url=server.url, reconnect_delay=0.01)
+        client.subscribe('vwap', 'BTC', 'EUR', '1s')
+        if callback is not None:
+            client.on_update(callback)
+        task = asyncio.ensure_future(client.run())
+        await asyncio.sleep(seconds)
+        await client.stop()
+        await task
+    return client
+
+
+def test_reconnects_after_malformed_message():
+    server = MockStreamServer(rate=200, drop_after=20, malformed_after=5, seed=1)
+    client = asyncio.run(_stream(server, 0.5))
+    assert client.invalid >= 2
+    assert client.reconnects >= 1
+    assert server.connections >= 2
+    assert len(client.buffer('vwap', 'BTC', 'EUR')) > 20
+
+
+def test_callback_errors_do_not_stop_the_stream():
+    def callback(channel, pair, message):
+        raise RuntimeError('callback failed')
+
+    server = MockStreamServer(rate=200, seed=1)
+    client = asyncio.run(_stream(server, 0.3, callback))
+    received = len(client.buffer('vwap', 'BTC', 'EUR'))
+    assert received > 10
+    assert client.callback_errors == received
+    assert client.errors == 0
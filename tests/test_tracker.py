@@ -0,0 +1,57 @@
+import asyncio
+
+from quant_sdk_lite.tracker import OrderTracker, CLOSED
+
+ORDERS = [{'base': 'BTC', 'quote': 'EUR', 'direction': 'buy', 'quantity': 0.01, 'exchanges': 'Kraken'}] * 3
+
+
+def _tracker(sdk) -> OrderTracker:
+    return OrderTracker(sdk, workers=4, min_interval=0.01, max_interval=0.05)
+
+
+def test_orders_are_polled_until_closed(api, sdk):
+    events = []
+    with _tracker(sdk) as tracker:
+        tracker.on_event(events.append)
+        responses = tracker.submit_many(ORDERS)
+        assert tracker.wait(timeout=5)
+    assert sorted(event.order_id for event in events) == sorted(r['order']['order_id'] for r in responses)
+    assert all(event.status == CLOSED and event.terminal for event in events)
+    assert tracker.open_orders == []
+
+
+def test_failing_callback_does_not_block_listeners(api, sdk):
+    def fail(event):
+        raise RuntimeError('callback failed')
+
+    received = []
+
+    async def consume(tracker: OrderTracker):
+        async for event in tracker.events():
+            received.append(event)
+
+    async def main():
+        tracker = _tracker(sdk)
+        tracker.on_event(fail)
+        tracker.on_event(received.append)
+        consumer = asyncio.ensure_future(consume(tracker))
+        await asyncio.sleep(0)
+        tracker.start()
+        await asyncio.get_running_loop().run_in_executor(None, tracker.submit_many, ORDERS)
+        assert await asyncio.get_running_loop().run_in_executor(None, tracker.wait, 5)
+        tracker.stop()
+        await consumer
+        return tracker
+
+    tracker = asyncio.run(main())
+    assert len(received) == 6
+    assert tracker.callback_errors == 3
+
+
+def test_restart_after_stop(api, sdk):
+    tracker = _tracker(sdk)
+    for _ in range(2):
+        tracker.start()
+        tracker.submit_many(ORDERS)
+        assert tracker.wait(timeout=5)
+        tracker.stop()
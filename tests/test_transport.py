@@ -0,0 +1,23 @@
+from quant_sdk_lite.transport import Transport
+
+
+def _connections(transport: Transport) -> int:
+    pools = transport.session.get_adapter(transport.base_url).poolmanager.pools
+    return sum(pools[key].num_connections for key in pools.keys())
+
+
+def test_requests_reuse_one_connection(api, sdk):
+    for _ in range(5):
+        assert sdk.get_vwap('BTC', 'EUR', '1m')['ticker'] == 'BTCEUR'
+    assert api.requests == 5
+    assert _connections(sdk.transport) == 1
+
+
+def test_compressed_bodies_are_decoded(api, sdk):
+    response = sdk.transport.get('/data/vwap/historic/BTCEUR/60s', params={'from': 1598918400, 'to': 1599004800})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert len(response.json()) == 1441
+
+
+def test_token_is_sent(sdk):
+    assert sdk.transport.session.headers['x-api-key'] == 'token'